@@ -43,9 +43,9 @@ print("-" * 40)
 
 cursor.execute("""
     SELECT coin_type, COUNT(*) as tx_count,
-           MIN(detected_at) as first_tx,
-           MAX(detected_at) as latest_tx
-    FROM transactions
+           datetime(MIN(detected_at), 'unixepoch') as first_tx,
+           datetime(MAX(detected_at), 'unixepoch') as latest_tx
+    FROM transactions_v
     GROUP BY coin_type
 """)
 
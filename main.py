@@ -7,8 +7,6 @@ import sys
 import time
 from datetime import datetime, timedelta
 import pytz
-from apscheduler.schedulers.blocking import BlockingScheduler
-from apscheduler.triggers.cron import CronTrigger
 
 # Add src to path
 sys.path.insert(0, 'src')
@@ -51,7 +49,6 @@ class WhaleMonitorApp:
         else:
             print("[WARNING] Failed to send test message. Check webhook URL.\n")
 
-        self.scheduler = None
         self.last_digest_date = None
 
     def check_wallets_job(self):
@@ -81,9 +78,11 @@ class WhaleMonitorApp:
             min_score=8  # Very high significance
         )
 
+        # Queue everything and flush once: alerts go out 10 embeds per
+        # webhook call instead of one HTTP round trip (plus sleep) each
         for tx in significant_txs:
-            self.notifier.send_significant_transaction_alert(tx, tx['analysis'])
-            time.sleep(1)  # Rate limit
+            self.notifier.enqueue_alert(tx, tx['analysis'])
+        self.notifier.flush()
 
     def send_daily_digest_job(self):
         """Job to send daily digest."""
@@ -99,6 +98,9 @@ class WhaleMonitorApp:
         print(f"{'='*60}\n")
 
         try:
+            # Warm the price cache for all coins with a single request
+            self.monitor.api_client.get_prices(['BTC', 'DOGE', 'LTC'])
+
             # Generate summaries for each coin
             summaries = {}
 
@@ -119,44 +121,30 @@ class WhaleMonitorApp:
         except Exception as e:
             print(f"[ERROR] Failed to generate/send digest: {e}")
 
+    def _next_digest_time(self, timezone, hour: int, minute: int) -> datetime:
+        """Get the next digest datetime in the configured timezone."""
+        now_local = datetime.now(timezone).replace(tzinfo=None)
+        target = now_local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target <= now_local:
+            target += timedelta(days=1)
+        return timezone.localize(target)
+
     def run_continuous(self):
         """Run continuous monitoring with scheduling."""
         print("\n" + "=" * 60)
         print("Starting continuous monitoring...")
         print("=" * 60 + "\n")
 
-        # Create scheduler
         timezone = pytz.timezone(self.config.NOTIFICATION_TIMEZONE)
-        self.scheduler = BlockingScheduler(timezone=timezone)
 
-        # Schedule periodic wallet checks
         check_interval = self.config.POLL_INTERVAL_MINUTES
-        self.scheduler.add_job(
-            self.check_wallets_job,
-            'interval',
-            minutes=check_interval,
-            id='wallet_check',
-            next_run_time=datetime.now()  # Run immediately
-        )
+        interval_seconds = check_interval * 60
 
-        print(f"[OK] Scheduled wallet checks every {check_interval} minutes")
-
-        # Schedule daily digest
         digest_time = self.config.NOTIFICATION_TIME
         hour, minute = map(int, digest_time.split(':'))
+        next_digest = self._next_digest_time(timezone, hour, minute)
 
-        digest_trigger = CronTrigger(
-            hour=hour,
-            minute=minute,
-            timezone=timezone
-        )
-
-        self.scheduler.add_job(
-            self.send_daily_digest_job,
-            trigger=digest_trigger,
-            id='daily_digest'
-        )
-
+        print(f"[OK] Scheduled wallet checks every {check_interval} minutes")
         print(f"[OK] Scheduled daily digest at {digest_time} {self.config.NOTIFICATION_TIMEZONE}")
 
         print("\n" + "=" * 60)
@@ -164,8 +152,30 @@ class WhaleMonitorApp:
         print("Press Ctrl+C to stop")
         print("=" * 60 + "\n")
 
+        # Drift-corrected loop: ticks are scheduled against the monotonic
+        # clock from the intended tick time, not from when the job finished,
+        # so slow cycles don't push the schedule later and later.
+        next_check = time.monotonic()  # run immediately
+
         try:
-            self.scheduler.start()
+            while True:
+                digest_wait = (next_digest - datetime.now(pytz.utc)).total_seconds()
+
+                if digest_wait <= 0:
+                    self.send_daily_digest_job()
+                    next_digest = self._next_digest_time(timezone, hour, minute)
+                    continue
+
+                check_wait = next_check - time.monotonic()
+                if check_wait <= 0:
+                    self.check_wallets_job()
+                    next_check += interval_seconds
+                    if next_check <= time.monotonic():
+                        # Fell more than a full interval behind; realign
+                        next_check = time.monotonic() + interval_seconds
+                    continue
+
+                time.sleep(min(check_wait, digest_wait))
         except (KeyboardInterrupt, SystemExit):
             print("\n\n[OK] Shutting down gracefully...")
             self.cleanup()
@@ -185,8 +195,6 @@ class WhaleMonitorApp:
     def cleanup(self):
         """Cleanup resources."""
         print("\n=== Cleaning up ===")
-        if self.scheduler and self.scheduler.running:
-            self.scheduler.shutdown(wait=False)
         self.database.close()
         print("[OK] Cleanup complete")
 
@@ -211,8 +219,8 @@ def main():
 
     args = parser.parse_args()
 
-    # Load configuration
-    config = Config(env_file=args.config)
+    # Load configuration (cached; repeat calls return the same instance)
+    config = Config.load(args.config)
 
     # Create app
     app = WhaleMonitorApp(config)
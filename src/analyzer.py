@@ -4,7 +4,62 @@ Identifies significant whale movements and patterns.
 """
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-from database import WhaleDatabase
+from database import WhaleDatabase, _coin_id
+
+
+# Hot statements as module-level constants: sqlite3 caches prepared plans
+# keyed on the statement text, so a stable string means every call reuses
+# the cached plan instead of re-preparing.
+_SQL_HIST_STATS = """
+    SELECT COUNT(*) as total_count,
+           (strftime('%s', 'now') - MIN(detected_at)) / 86400.0 as days
+    FROM transactions
+    WHERE wallet_address = ? AND coin_type_id = ?
+    AND detected_at > strftime('%s', 'now') - 2592000
+"""
+
+_SQL_FLOW_WINDOW = """
+    SELECT
+        SUM(CASE WHEN is_outgoing = 0 THEN amount_native ELSE 0 END) as inflow,
+        SUM(CASE WHEN is_outgoing = 1 THEN amount_native ELSE 0 END) as outflow
+    FROM transactions
+    WHERE wallet_address = ? AND coin_type_id = ?
+    AND detected_at > strftime('%s', 'now') - ?
+"""
+
+
+def _build_score_table() -> Dict[tuple, tuple]:
+    """
+    Precompute (score, tags) for every flag combination.
+
+    The significance score is a pure function of four booleans, so all
+    16 outcomes are computed once at import time and batch scoring
+    becomes a single table lookup per row instead of a branch cascade.
+    """
+    table = {}
+    for is_large in (False, True):
+        for is_exchange in (False, True):
+            for is_unusual in (False, True):
+                for has_pattern in (False, True):
+                    score = 0
+                    tags = []
+                    if is_large:
+                        score += 4
+                        tags.append('LARGE')
+                    if is_exchange:
+                        score += 3
+                        tags.append('EXCHANGE')
+                    if is_unusual:
+                        score += 2
+                        tags.append('UNUSUAL')
+                    if has_pattern:
+                        score += 1
+                    key = (is_large, is_exchange, is_unusual, has_pattern)
+                    table[key] = (min(score, 10), tuple(tags))
+    return table
+
+
+_SCORE_TABLE = _build_score_table()
 
 
 class SignificanceAnalyzer:
@@ -23,52 +78,79 @@ class SignificanceAnalyzer:
         # Thresholds for unusual activity
         self.unusual_activity_multiplier = 3.0  # 3x normal activity
 
-    def is_large_transaction(self, tx: Dict) -> bool:
-        """Check if transaction exceeds size threshold."""
-        coin_type = tx['coin_type']
-        amount_native = tx['amount_native']
-        amount_usd = tx.get('amount_usd', 0)
+        # Per-coin (native, usd) threshold scalars resolved once, so the
+        # per-transaction check is a single lookup and two comparisons
+        inf = float('inf')
+        self._thresh = {
+            coin: (limits.get('large_tx', inf), limits.get('usd', inf))
+            for coin, limits in self.thresholds.items()
+        }
+        self._thresh_default = (inf, inf)
 
-        threshold = self.thresholds.get(coin_type, {})
+    def is_large_transaction(self, tx: Dict) -> bool:
+        """Check if transaction exceeds size threshold (native OR USD)."""
+        thresh_native, thresh_usd = self._thresh.get(tx['coin_type'], self._thresh_default)
+        return (tx['amount_native'] >= thresh_native
+                or (tx.get('amount_usd') or 0) >= thresh_usd)
 
-        # Check native amount OR USD value
-        if amount_native >= threshold.get('large_tx', float('inf')):
-            return True
+    def classify_large_batch(self, transactions: List[Dict]) -> List[bool]:
+        """
+        Check the large-transaction threshold for a batch of transactions.
 
-        if amount_usd and amount_usd >= threshold.get('usd', float('inf')):
-            return True
+        One pass with the per-coin thresholds hoisted out of the loop,
+        instead of re-resolving the threshold dict per row. Useful for
+        in-memory batches (e.g. freshly polled transactions) that aren't
+        in the database yet; persisted rows get this predicate from SQL.
+        """
+        thresh = self._thresh
+        default = self._thresh_default
 
-        return False
+        results = []
+        for tx in transactions:
+            thresh_native, thresh_usd = thresh.get(tx['coin_type'], default)
+            results.append(
+                tx['amount_native'] >= thresh_native
+                or (tx.get('amount_usd') or 0) >= thresh_usd
+            )
+        return results
 
     def is_exchange_transfer(self, tx: Dict) -> bool:
         """Check if transaction involves an exchange."""
         return tx.get('is_exchange_related', False)
 
-    def is_unusual_activity(self, wallet_address: str, coin_type: str, hours: int = 24) -> bool:
+    def is_unusual_activity(self, wallet_address: str, coin_type: str, hours: int = 24,
+                            hist_stats: Optional[Dict] = None,
+                            recent_count: Optional[int] = None) -> bool:
         """
         Detect if a wallet is unusually active.
 
         Compare recent activity to historical average.
+
+        Args:
+            hist_stats: Optional precomputed stats dict from
+                WhaleDatabase.get_wallet_hist_stats, keyed by
+                (wallet_address, coin_type). Avoids a per-wallet query.
+            recent_count: Optional precomputed count of the wallet's
+                transactions in the window (e.g. from a Counter built
+                once over the candidate batch). Avoids re-fetching and
+                re-filtering the window per wallet.
         """
-        # Get recent transaction count
-        recent_txs = self.db.get_recent_transactions(coin_type, hours=hours)
-        wallet_recent = [tx for tx in recent_txs if tx['wallet_address'] == wallet_address]
-        recent_count = len(wallet_recent)
+        if recent_count is None:
+            # Get recent transaction count (streamed, no intermediate list)
+            recent_txs = self.db.iter_recent_transactions(coin_type, hours=hours)
+            recent_count = sum(1 for tx in recent_txs if tx['wallet_address'] == wallet_address)
 
         if recent_count == 0:
             return False
 
         # Get historical average (30-day lookback)
-        cursor = self.db.conn.cursor()
-        cursor.execute("""
-            SELECT COUNT(*) as total_count,
-                   JULIANDAY('now') - JULIANDAY(MIN(detected_at)) as days
-            FROM transactions
-            WHERE wallet_address = ? AND coin_type = ?
-            AND detected_at > datetime('now', '-30 days')
-        """, (wallet_address, coin_type))
-
-        result = cursor.fetchone()
+        if hist_stats is not None:
+            result = hist_stats.get((wallet_address, coin_type))
+        else:
+            cursor = self.db.conn.cursor()
+            cursor.execute(_SQL_HIST_STATS, (wallet_address, _coin_id(coin_type)))
+            result = cursor.fetchone()
+
         if not result or result['days'] == 0:
             # Not enough history
             return False
@@ -83,25 +165,28 @@ class SignificanceAnalyzer:
         # Unusual if current activity is > 3x normal
         return recent_count > (expected_in_period * self.unusual_activity_multiplier)
 
-    def detect_accumulation_pattern(self, wallet_address: str, coin_type: str, days: int = 7) -> Optional[str]:
+    def detect_accumulation_pattern(self, wallet_address: str, coin_type: str, days: int = 7,
+                                    flow_stats: Optional[Dict] = None) -> Optional[str]:
         """
         Detect if wallet is accumulating or distributing.
 
+        Args:
+            flow_stats: Optional precomputed stats dict from
+                WhaleDatabase.get_wallet_flow_stats, keyed by
+                (wallet_address, coin_type). Avoids a per-wallet query.
+
         Returns: 'accumulating', 'distributing', or None
         """
-        cursor = self.db.conn.cursor()
-
-        # Get net flow (incoming - outgoing)
-        cursor.execute("""
-            SELECT
-                SUM(CASE WHEN is_outgoing = 0 THEN amount_native ELSE 0 END) as inflow,
-                SUM(CASE WHEN is_outgoing = 1 THEN amount_native ELSE 0 END) as outflow
-            FROM transactions
-            WHERE wallet_address = ? AND coin_type = ?
-            AND detected_at > datetime('now', '-' || ? || ' days')
-        """, (wallet_address, coin_type, days))
-
-        result = cursor.fetchone()
+        if flow_stats is not None:
+            result = flow_stats.get((wallet_address, coin_type))
+        else:
+            cursor = self.db.conn.cursor()
+
+            # Get net flow (incoming - outgoing); the window is bound as a
+            # single parameter so the statement text stays constant
+            cursor.execute(_SQL_FLOW_WINDOW, (wallet_address, _coin_id(coin_type), days * 86400))
+            result = cursor.fetchone()
+
         if not result:
             return None
 
@@ -118,10 +203,22 @@ class SignificanceAnalyzer:
 
         return 'accumulating' if net_flow > 0 else 'distributing'
 
-    def analyze_transaction(self, tx: Dict) -> Dict:
+    def analyze_transaction(self, tx: Dict, hist_stats: Optional[Dict] = None,
+                            flow_stats: Optional[Dict] = None,
+                            recent_counts: Optional[Dict] = None,
+                            min_score: int = 0) -> Dict:
         """
         Analyze a transaction for all significance factors.
 
+        When analyzing a batch, pass precomputed hist_stats/flow_stats
+        (see WhaleDatabase.get_wallet_hist_stats / get_wallet_flow_stats)
+        and recent_counts (a Counter over (wallet_address, coin_type)
+        built once from the batch) to avoid per-transaction queries.
+
+        Pass min_score when only transactions at or above a score matter:
+        the database-backed checks (unusual activity, pattern) are skipped
+        for transactions that can't reach it anyway.
+
         Returns dict with analysis results.
         """
         analysis = {
@@ -133,19 +230,30 @@ class SignificanceAnalyzer:
             'tags': []
         }
 
+        # The two DB-backed checks add at most 3 (unusual=2, pattern=1);
+        # skip them when the cheap flags already rule min_score out
+        quick_score = (4 if analysis['is_large'] else 0) + (3 if analysis['is_exchange'] else 0)
+
         # Check unusual activity
-        if tx.get('wallet_address'):
+        if tx.get('wallet_address') and quick_score + 3 >= min_score:
+            recent_count = None
+            if recent_counts is not None:
+                recent_count = recent_counts.get((tx['wallet_address'], tx['coin_type']), 0)
+
             analysis['is_unusual'] = self.is_unusual_activity(
                 tx['wallet_address'],
                 tx['coin_type'],
-                hours=24
+                hours=24,
+                hist_stats=hist_stats,
+                recent_count=recent_count
             )
 
             # Check accumulation pattern
             analysis['pattern'] = self.detect_accumulation_pattern(
                 tx['wallet_address'],
                 tx['coin_type'],
-                days=7
+                days=7,
+                flow_stats=flow_stats
             )
 
         # Calculate significance score (0-10)
@@ -183,14 +291,38 @@ class SignificanceAnalyzer:
         Returns:
             List of transactions with analysis
         """
-        transactions = self.db.get_recent_transactions(coin_type, hours=hours, limit=1000)
+        # Single SQL pass computes is_large / is_unusual / pattern for every
+        # candidate row, instead of two extra queries per transaction.
+        candidates = self.db.get_candidate_significant(
+            coin_type, hours, self.thresholds,
+            unusual_multiplier=self.unusual_activity_multiplier
+        )
 
         significant = []
-        for tx in transactions:
-            analysis = self.analyze_transaction(tx)
-            if analysis['significance_score'] >= min_score:
-                tx['analysis'] = analysis
-                significant.append(tx)
+        for tx in candidates:
+            is_large = bool(tx.pop('is_large', 0))
+            is_unusual = bool(tx.pop('is_unusual', 0))
+            pattern = tx.pop('pattern', None)
+            is_exchange = self.is_exchange_transfer(tx)
+
+            score, tags = _SCORE_TABLE[(is_large, is_exchange, is_unusual, pattern is not None)]
+
+            if score < min_score:
+                continue
+
+            tags = list(tags)
+            if pattern:
+                tags.append(pattern.upper())
+
+            tx['analysis'] = {
+                'is_large': is_large,
+                'is_exchange': is_exchange,
+                'is_unusual': is_unusual,
+                'pattern': pattern,
+                'significance_score': score,
+                'tags': tags
+            }
+            significant.append(tx)
 
         # Sort by significance score
         significant.sort(key=lambda x: x['analysis']['significance_score'], reverse=True)
@@ -208,9 +340,15 @@ class SignificanceAnalyzer:
         - significant_moves
         - most_active_wallets
         """
-        transactions = self.db.get_recent_transactions(coin_type, hours=hours, limit=10000)
+        # All sums and counts happen inside SQLite in a single query
+        threshold = self.thresholds.get(coin_type, {})
+        aggregates = self.db.get_summary_aggregates(
+            coin_type, hours=hours,
+            large_tx_native=threshold.get('large_tx', float('inf')),
+            large_tx_usd=threshold.get('usd', float('inf'))
+        )
 
-        if not transactions:
+        if aggregates['tx_count'] == 0:
             return {
                 'total_volume_native': 0,
                 'total_volume_usd': 0,
@@ -221,39 +359,17 @@ class SignificanceAnalyzer:
                 'most_active': []
             }
 
-        # Calculate stats
-        total_volume_native = sum(tx.get('amount_native', 0) for tx in transactions)
-        total_volume_usd = sum(tx.get('amount_usd', 0) or 0 for tx in transactions)
-
-        exchange_inflow = sum(
-            tx.get('amount_native', 0)
-            for tx in transactions
-            if tx.get('is_exchange_related') and tx.get('is_outgoing')
-        )
-
-        exchange_outflow = sum(
-            tx.get('amount_native', 0)
-            for tx in transactions
-            if tx.get('is_exchange_related') and not tx.get('is_outgoing')
-        )
-
-        # Count significant transactions
-        significant_count = sum(
-            1 for tx in transactions
-            if self.is_large_transaction(tx) or self.is_exchange_transfer(tx)
-        )
-
         # Get most active wallets
         most_active = self.db.get_most_active_wallets(coin_type, hours=hours, limit=5)
 
         return {
-            'total_volume_native': total_volume_native,
-            'total_volume_usd': total_volume_usd,
-            'transaction_count': len(transactions),
-            'exchange_inflow': exchange_inflow,
-            'exchange_outflow': exchange_outflow,
-            'exchange_net_flow': exchange_inflow - exchange_outflow,
-            'significant_count': significant_count,
+            'total_volume_native': aggregates['total_volume_native'],
+            'total_volume_usd': aggregates['total_volume_usd'],
+            'transaction_count': aggregates['tx_count'],
+            'exchange_inflow': aggregates['exchange_inflow'],
+            'exchange_outflow': aggregates['exchange_outflow'],
+            'exchange_net_flow': aggregates['exchange_inflow'] - aggregates['exchange_outflow'],
+            'significant_count': aggregates['significant_count'],
             'most_active': most_active
         }
 
@@ -3,10 +3,47 @@ Blockchain API client for fetching transaction data.
 Supports BTC, DOGE, and LTC using BlockCypher API.
 """
 import requests
+import threading
 import time
 from typing import List, Dict, Optional
 from datetime import datetime
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# The chain JSON is deeply nested and decoded on every request; orjson
+# parses it several times faster than the stdlib decoder behind
+# response.json(). Fall back gracefully if it isn't installed.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+# Coin identifier maps, built once at import: BlockCypher path segments
+# and CoinGecko ids
+_COIN_SHORT = {'BTC': 'btc', 'DOGE': 'doge', 'LTC': 'ltc'}
+_COIN_ID = {'BTC': 'bitcoin', 'DOGE': 'dogecoin', 'LTC': 'litecoin'}
+
+# Addresses per multi-address ("batched") BlockCypher request; the URL
+# stays comfortably short and one slow wallet can't stall too many others
+_BATCH_SIZE = 25
+
+
+def _norm_tx(tx: Dict) -> Dict:
+    """Normalize a raw BlockCypher transaction to the fields we use."""
+    return {
+        'hash': tx['hash'],
+        'block_height': tx.get('block_height', 0),
+        'confirmed': tx.get('confirmed') is not None,
+        'received': tx.get('received', ''),
+        'total': tx.get('total', 0),
+        'fees': tx.get('fees', 0),
+        'inputs': tx.get('inputs', []),
+        'outputs': tx.get('outputs', []),
+    }
+
 
 class BlockchainAPIClient:
     """Client for interacting with blockchain APIs."""
@@ -16,9 +53,42 @@ class BlockchainAPIClient:
         self.base_url = "https://api.blockcypher.com/v1"
         self.session = requests.Session()
 
+        # Keep-alive connection pool shared by BlockCypher and CoinGecko
+        # calls, with retries for transient failures: one TLS handshake
+        # per host is amortized across the whole poll cycle. The pool is
+        # sized past the monitor's 16 workers so no thread ever drops a
+        # connection (urllib3 discards, not queues, beyond pool_maxsize).
+        # Rate-limit (429) and transient server errors are retried
+        # in-stream with exponential backoff, honoring any Retry-After
+        # header.
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=1.0,
+                status_forcelist=[429, 502, 503, 504],
+                allowed_methods=['GET'],
+                respect_retry_after_header=True
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Per-coin URL prefixes built once instead of a coin_map dict +
+        # f-string per request
+        self._coin_urls = {
+            coin: f"{self.base_url}/{short}/main"
+            for coin, short in _COIN_SHORT.items()
+        }
+
         # Rate limiting: BlockCypher free tier allows 3 requests/sec, 200 requests/hour
+        # Treated as a global budget shared across worker threads: each
+        # caller reserves the next free slot, so requests stay evenly
+        # spaced while their latency overlaps.
         self.last_request_time = 0
         self.min_request_interval = 0.35  # 350ms between requests (~ 2.8 req/sec)
+        self._rate_lock = threading.Lock()
 
         # Price cache (refresh every 5 minutes)
         self.price_cache = {}
@@ -26,11 +96,20 @@ class BlockchainAPIClient:
         self.price_cache_duration = 300  # 5 minutes
 
     def _rate_limit(self):
-        """Implement rate limiting to avoid API throttling."""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_request_interval:
-            time.sleep(self.min_request_interval - elapsed)
-        self.last_request_time = time.time()
+        """Implement rate limiting to avoid API throttling (thread-safe)."""
+        with self._rate_lock:
+            now = time.time()
+            next_slot = self.last_request_time + self.min_request_interval
+            if next_slot > now:
+                # Reserve the next slot; sleep outside the lock
+                self.last_request_time = next_slot
+                wait = next_slot - now
+            else:
+                self.last_request_time = now
+                wait = 0
+
+        if wait > 0:
+            time.sleep(wait)
 
     def _make_request(self, url: str, params: Optional[Dict] = None) -> Optional[Dict]:
         """Make HTTP request with error handling."""
@@ -45,13 +124,11 @@ class BlockchainAPIClient:
 
             response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
-            return response.json()
+            return _loads(response.content)
 
         except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 429:
-                print(f"[WARNING] Rate limit exceeded, waiting 60s...")
-                time.sleep(60)
-                return None
+            # 429s are already retried with backoff by the session adapter;
+            # landing here means the retry budget is exhausted
             print(f"[ERROR] HTTP error: {e}")
             return None
         except requests.exceptions.RequestException as e:
@@ -61,7 +138,8 @@ class BlockchainAPIClient:
             print(f"[ERROR] Invalid JSON response: {e}")
             return None
 
-    def get_address_transactions(self, address: str, coin_type: str, limit: int = 50) -> List[Dict]:
+    def get_address_transactions(self, address: str, coin_type: str, limit: int = 50,
+                                 after: Optional[int] = None) -> List[Dict]:
         """
         Fetch recent transactions for an address.
 
@@ -69,52 +147,74 @@ class BlockchainAPIClient:
             address: Wallet address
             coin_type: 'BTC', 'DOGE', or 'LTC'
             limit: Maximum number of transactions to fetch
+            after: Only fetch transactions above this block height
+                (filtered server-side by BlockCypher)
 
         Returns:
             List of transaction dictionaries
         """
-        coin_map = {
-            'BTC': 'btc',
-            'DOGE': 'doge',
-            'LTC': 'ltc'
-        }
-
-        coin = coin_map.get(coin_type)
-        if not coin:
+        coin_url = self._coin_urls.get(coin_type)
+        if not coin_url:
             print(f"[ERROR] Unsupported coin type: {coin_type}")
             return []
 
-        url = f"{self.base_url}/{coin}/main/addrs/{address}/full"
+        url = f"{coin_url}/addrs/{address}/full"
         params = {'limit': min(limit, 50)}  # BlockCypher max is 50
+        if after is not None:
+            params['after'] = after
 
         data = self._make_request(url, params)
         if not data:
             return []
 
-        transactions = []
-        for tx in data.get('txs', []):
-            transactions.append({
-                'hash': tx['hash'],
-                'block_height': tx.get('block_height', 0),
-                'confirmed': tx.get('confirmed') is not None,
-                'received': tx.get('received', ''),
-                'total': tx.get('total', 0),
-                'fees': tx.get('fees', 0),
-                'inputs': tx.get('inputs', []),
-                'outputs': tx.get('outputs', []),
-            })
-
-        return transactions
+        return [_norm_tx(tx) for tx in data.get('txs', [])]
+
+    def get_address_transactions_batch(self, addresses: List[str], coin_type: str,
+                                       limit: int = 50,
+                                       after: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """
+        Fetch transactions for several addresses with batched requests.
+
+        BlockCypher treats a ';'-joined address list as a batch and
+        returns one object per address, so each HTTP round trip covers
+        up to _BATCH_SIZE wallets instead of one.
+
+        Returns:
+            Dict mapping each address to its transaction list
+        """
+        coin_url = self._coin_urls.get(coin_type)
+        if not coin_url:
+            print(f"[ERROR] Unsupported coin type: {coin_type}")
+            return {}
+
+        params = {'limit': min(limit, 50)}
+        if after is not None:
+            params['after'] = after
+
+        results = {}
+        for i in range(0, len(addresses), _BATCH_SIZE):
+            chunk = addresses[i:i + _BATCH_SIZE]
+            url = f"{coin_url}/addrs/{';'.join(chunk)}/full"
+            data = self._make_request(url, dict(params))
+            if not data:
+                continue
+            # A single-address batch comes back as a bare object
+            if isinstance(data, dict):
+                data = [data]
+            for entry in data:
+                results[entry.get('address')] = [
+                    _norm_tx(tx) for tx in entry.get('txs', [])
+                ]
+
+        return results
 
     def get_address_balance(self, address: str, coin_type: str) -> Optional[float]:
         """Get current balance for an address."""
-        coin_map = {'BTC': 'btc', 'DOGE': 'doge', 'LTC': 'ltc'}
-        coin = coin_map.get(coin_type)
-
-        if not coin:
+        coin_url = self._coin_urls.get(coin_type)
+        if not coin_url:
             return None
 
-        url = f"{self.base_url}/{coin}/main/addrs/{address}/balance"
+        url = f"{coin_url}/addrs/{address}/balance"
         data = self._make_request(url)
 
         if not data:
@@ -136,19 +236,96 @@ class BlockchainAPIClient:
         Returns:
             List of new transactions
         """
-        all_txs = self.get_address_transactions(address, coin_type, limit=50)
+        # Let the server filter by height: idle wallets return an empty
+        # (tiny) response instead of their last 50 transactions
+        all_txs = self.get_address_transactions(address, coin_type, limit=50,
+                                                after=since_block)
 
         if since_block is None:
             return all_txs
 
-        # Filter transactions by block height
+        # Keep the client-side filter as a safety net for unconfirmed
+        # transactions (block_height -1/0) included in the response
         new_txs = [tx for tx in all_txs if tx.get('block_height', 0) > since_block]
         return new_txs
 
+    def get_latest_transactions_batch(self, addresses: List[str], coin_type: str,
+                                      since_blocks: Dict[str, int]) -> Dict[str, List[Dict]]:
+        """
+        Get new transactions for several tracked addresses at once.
+
+        The server-side height filter is shared per batch, so it uses the
+        oldest last-seen block in the group; the precise per-address
+        cutoff is applied client-side.
+
+        Args:
+            addresses: Wallet addresses to check
+            coin_type: Coin type
+            since_blocks: Last seen block height per address
+
+        Returns:
+            Dict mapping each address to its new transactions
+        """
+        after = min((b for b in since_blocks.values() if b > 0), default=None)
+        fetched = self.get_address_transactions_batch(addresses, coin_type,
+                                                      limit=50, after=after)
+
+        results = {}
+        for address, txs in fetched.items():
+            since = since_blocks.get(address, 0)
+            if since > 0:
+                txs = [tx for tx in txs if tx.get('block_height', 0) > since]
+            results[address] = txs
+        return results
+
+    def get_prices(self, coin_types: List[str]) -> Dict[str, Optional[float]]:
+        """
+        Get current USD prices for several coins in one request.
+
+        CoinGecko's simple/price endpoint accepts comma-separated ids, so
+        one call warms the price cache for all monitored coins instead of
+        one HTTP round-trip per coin.
+        """
+        ids = {_COIN_ID[c]: c for c in coin_types if c in _COIN_ID}
+        if not ids:
+            return {}
+
+        url = "https://api.coingecko.com/api/v3/simple/price"
+        params = {
+            'ids': ','.join(ids),
+            'vs_currencies': 'usd'
+        }
+
+        prices = {}
+        now = time.time()
+
+        try:
+            response = self.session.get(url, params=params, timeout=10)
+            response.raise_for_status()
+            data = _loads(response.content)
+
+            for coin_id, coin_type in ids.items():
+                price = data.get(coin_id, {}).get('usd')
+                if price:
+                    # Update cache
+                    self.price_cache[coin_type] = price
+                    self.price_cache_time[coin_type] = now
+                prices[coin_type] = price
+
+        except Exception as e:
+            print(f"[ERROR] Failed to fetch prices: {e}")
+            # Fall back to cached values, even if expired
+            for coin_type in ids.values():
+                prices[coin_type] = self.price_cache.get(coin_type)
+
+        return prices
+
     def get_price(self, coin_type: str) -> Optional[float]:
         """
         Get current USD price for a coin.
-        Uses CoinGecko API (free, no key needed).
+
+        Served from the cache when warm (see get_prices); falls back to a
+        single CoinGecko request on a miss.
         """
         # Check cache first
         now = time.time()
@@ -156,13 +333,7 @@ class BlockchainAPIClient:
             if now - self.price_cache_time[coin_type] < self.price_cache_duration:
                 return self.price_cache[coin_type]
 
-        coin_map = {
-            'BTC': 'bitcoin',
-            'DOGE': 'dogecoin',
-            'LTC': 'litecoin'
-        }
-
-        coin_id = coin_map.get(coin_type)
+        coin_id = _COIN_ID.get(coin_type)
         if not coin_id:
             return None
 
@@ -173,9 +344,9 @@ class BlockchainAPIClient:
         }
 
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _loads(response.content)
 
             price = data.get(coin_id, {}).get('usd')
             if price:
@@ -190,15 +361,28 @@ class BlockchainAPIClient:
             # Return cached value if available, even if expired
             return self.price_cache.get(coin_type)
 
+    def get_chain_height(self, coin_type: str) -> Optional[int]:
+        """
+        Get the current chain tip height for a coin.
+
+        One tiny request against the chain root; the monitor uses it to
+        skip whole wallet scans when no new block has been mined since
+        the previous cycle.
+        """
+        coin_url = self._coin_urls.get(coin_type)
+        if not coin_url:
+            return None
+
+        data = self._make_request(coin_url)
+        return data.get('height') if data else None
+
     def get_transaction_details(self, tx_hash: str, coin_type: str) -> Optional[Dict]:
         """Get detailed information about a specific transaction."""
-        coin_map = {'BTC': 'btc', 'DOGE': 'doge', 'LTC': 'ltc'}
-        coin = coin_map.get(coin_type)
-
-        if not coin:
+        coin_url = self._coin_urls.get(coin_type)
+        if not coin_url:
             return None
 
-        url = f"{self.base_url}/{coin}/main/txs/{tx_hash}"
+        url = f"{coin_url}/txs/{tx_hash}"
         return self._make_request(url)
 
 
@@ -2,71 +2,99 @@
 Configuration management for whale monitor.
 Loads settings from .env file with sensible defaults.
 """
+import functools
 import os
+import sys
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 
 
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Application configuration."""
-
-    def __init__(self, env_file: str = None):
+    """Application configuration.
+
+    Immutable snapshot of the environment, built once per process via
+    Config.load(): the ~10 os.getenv lookups and float/int casts happen
+    on the first call and every later call returns the same instance.
+    """
+
+    DISCORD_WEBHOOK_URL: str
+    NOTIFICATION_TIME: str
+    NOTIFICATION_TIMEZONE: str
+    BLOCKCYPHER_API_KEY: str
+    BTC_LARGE_TX_THRESHOLD: float
+    DOGE_LARGE_TX_THRESHOLD: float
+    LTC_LARGE_TX_THRESHOLD: float
+    POLL_INTERVAL_MINUTES: int
+    DATABASE_PATH: str
+    DATA_DIR: str
+    THRESHOLDS: dict
+
+    @classmethod
+    @functools.lru_cache(maxsize=1)
+    def load(cls, env_file: str = None) -> "Config":
+        """Load configuration from the environment (cached)."""
         # Try to load .env file
         if env_file:
             load_dotenv(env_file)
         else:
-            # Try common locations
+            # Try common locations; load_dotenv returns whether it found
+            # the file, saving a separate exists() stat call
             project_root = Path(__file__).parent.parent
             env_path = project_root / '.env'
-            if env_path.exists():
-                load_dotenv(env_path)
+            if load_dotenv(env_path):
                 print(f"[OK] Loaded configuration from {env_path}")
             else:
                 print(f"[WARNING] No .env file found. Using defaults.")
 
-        # Discord Configuration
-        self.DISCORD_WEBHOOK_URL = os.getenv('DISCORD_WEBHOOK_URL', '')
-
-        if not self.DISCORD_WEBHOOK_URL:
+        webhook_url = os.getenv('DISCORD_WEBHOOK_URL', '')
+        if not webhook_url:
             print("[WARNING] DISCORD_WEBHOOK_URL not set!")
 
-        # Notification Schedule
-        self.NOTIFICATION_TIME = os.getenv('NOTIFICATION_TIME', '20:00')
-        self.NOTIFICATION_TIMEZONE = os.getenv('NOTIFICATION_TIMEZONE', 'America/New_York')
-
-        # API Keys
-        self.BLOCKCYPHER_API_KEY = os.getenv('BLOCKCYPHER_API_KEY', '')
-
-        # Transaction Thresholds
-        self.BTC_LARGE_TX_THRESHOLD = float(os.getenv('BTC_LARGE_TX_THRESHOLD', '50'))
-        self.DOGE_LARGE_TX_THRESHOLD = float(os.getenv('DOGE_LARGE_TX_THRESHOLD', '10000000'))
-        self.LTC_LARGE_TX_THRESHOLD = float(os.getenv('LTC_LARGE_TX_THRESHOLD', '5000'))
-
-        # Monitoring Settings
-        self.POLL_INTERVAL_MINUTES = int(os.getenv('POLL_INTERVAL_MINUTES', '10'))
-
-        # Database path
-        self.DATABASE_PATH = os.getenv('DATABASE_PATH', 'data/whale_monitor.db')
-
-        # Data directory
-        self.DATA_DIR = os.getenv('DATA_DIR', 'data')
+        btc_threshold = float(os.getenv('BTC_LARGE_TX_THRESHOLD', '50'))
+        doge_threshold = float(os.getenv('DOGE_LARGE_TX_THRESHOLD', '10000000'))
+        ltc_threshold = float(os.getenv('LTC_LARGE_TX_THRESHOLD', '5000'))
+
+        return cls(
+            # Discord Configuration
+            DISCORD_WEBHOOK_URL=webhook_url,
+            # Notification Schedule
+            NOTIFICATION_TIME=os.getenv('NOTIFICATION_TIME', '20:00'),
+            NOTIFICATION_TIMEZONE=os.getenv('NOTIFICATION_TIMEZONE', 'America/New_York'),
+            # API Keys
+            BLOCKCYPHER_API_KEY=os.getenv('BLOCKCYPHER_API_KEY', ''),
+            # Transaction Thresholds
+            BTC_LARGE_TX_THRESHOLD=btc_threshold,
+            DOGE_LARGE_TX_THRESHOLD=doge_threshold,
+            LTC_LARGE_TX_THRESHOLD=ltc_threshold,
+            # Monitoring Settings
+            POLL_INTERVAL_MINUTES=int(os.getenv('POLL_INTERVAL_MINUTES', '10')),
+            # Database path
+            DATABASE_PATH=os.getenv('DATABASE_PATH', 'data/whale_monitor.db'),
+            # Data directory
+            DATA_DIR=os.getenv('DATA_DIR', 'data'),
+            # Per-coin threshold dict built once; get_thresholds callers
+            # on the classification path all share this instance
+            THRESHOLDS={
+                'BTC': {
+                    'large_tx': btc_threshold,
+                    'usd': 1000000  # $1M
+                },
+                'DOGE': {
+                    'large_tx': doge_threshold,
+                    'usd': 500000  # $500K
+                },
+                'LTC': {
+                    'large_tx': ltc_threshold,
+                    'usd': 500000  # $500K
+                }
+            },
+        )
 
     def get_thresholds(self):
-        """Get transaction thresholds as dict."""
-        return {
-            'BTC': {
-                'large_tx': self.BTC_LARGE_TX_THRESHOLD,
-                'usd': 1000000  # $1M
-            },
-            'DOGE': {
-                'large_tx': self.DOGE_LARGE_TX_THRESHOLD,
-                'usd': 500000  # $500K
-            },
-            'LTC': {
-                'large_tx': self.LTC_LARGE_TX_THRESHOLD,
-                'usd': 500000  # $500K
-            }
-        }
+        """Get transaction thresholds as dict (precomputed in load)."""
+        return self.THRESHOLDS
 
     def validate(self) -> bool:
         """Validate critical configuration."""
@@ -79,9 +107,9 @@ class Config:
             errors.append("POLL_INTERVAL_MINUTES must be >= 5 to avoid rate limits")
 
         if errors:
-            print("\n[ERROR] Configuration validation failed:")
-            for error in errors:
-                print(f"  - {error}")
+            # One write (and one stdout lock/flush) for the whole report
+            sys.stdout.write("\n[ERROR] Configuration validation failed:\n"
+                             + "\n".join(f"  - {error}" for error in errors) + "\n")
             return False
 
         print("[OK] Configuration validated successfully")
@@ -89,24 +117,32 @@ class Config:
 
     def print_config(self):
         """Print current configuration (hiding sensitive values)."""
-        print("\n=== Current Configuration ===")
-        print(f"Discord Webhook: {'Set' if self.DISCORD_WEBHOOK_URL else 'NOT SET'}")
-        print(f"Notification Time: {self.NOTIFICATION_TIME} {self.NOTIFICATION_TIMEZONE}")
-        print(f"Poll Interval: {self.POLL_INTERVAL_MINUTES} minutes")
-        print(f"BlockCypher API Key: {'Set' if self.BLOCKCYPHER_API_KEY else 'Not set (using free tier)'}")
-        print(f"\nThresholds:")
-        print(f"  BTC: {self.BTC_LARGE_TX_THRESHOLD} BTC")
-        print(f"  DOGE: {self.DOGE_LARGE_TX_THRESHOLD:,.0f} DOGE")
-        print(f"  LTC: {self.LTC_LARGE_TX_THRESHOLD} LTC")
-        print(f"\nDatabase: {self.DATABASE_PATH}")
-        print(f"Data Directory: {self.DATA_DIR}")
-        print("=" * 30 + "\n")
+        # Emitted as a single write: one stdout lock/flush instead of a
+        # dozen, which keeps startup/healthcheck output cheap and atomic
+        sys.stdout.write(
+            f"""
+=== Current Configuration ===
+Discord Webhook: {'Set' if self.DISCORD_WEBHOOK_URL else 'NOT SET'}
+Notification Time: {self.NOTIFICATION_TIME} {self.NOTIFICATION_TIMEZONE}
+Poll Interval: {self.POLL_INTERVAL_MINUTES} minutes
+BlockCypher API Key: {'Set' if self.BLOCKCYPHER_API_KEY else 'Not set (using free tier)'}
+
+Thresholds:
+  BTC: {self.BTC_LARGE_TX_THRESHOLD} BTC
+  DOGE: {self.DOGE_LARGE_TX_THRESHOLD:,.0f} DOGE
+  LTC: {self.LTC_LARGE_TX_THRESHOLD} LTC
+
+Database: {self.DATABASE_PATH}
+Data Directory: {self.DATA_DIR}
+{'=' * 30}
+
+""")
 
 
 if __name__ == "__main__":
     print("=== Testing Configuration ===\n")
 
-    config = Config()
+    config = Config.load()
     config.print_config()
 
     print("Validating configuration...")
@@ -3,11 +3,169 @@ Database module for storing whale transaction data.
 Uses SQLite for simplicity and portability.
 """
 import sqlite3
-from typing import List, Dict, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
 
+# orjson serializes the address lists several times faster than the
+# stdlib and emits bytes that bind straight to a BLOB; fall back
+# gracefully if it isn't installed
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    _dumps = json.dumps
+
+
+# FILTER-clause aggregates (SQLite >= 3.30, released 2019) compile to
+# tighter bytecode than SUM(CASE WHEN ...) — filtered rows are skipped
+# instead of contributing an arithmetic zero-add
+_HAS_FILTER = sqlite3.sqlite_version_info >= (3, 30, 0)
+
+# Interned coin ids: coin_type is one of three short strings repeated in
+# every row and every index entry carrying it. Storing an integer id
+# shrinks rows and indexes and turns equality filters into integer
+# compares. The names live in the coin_types table for ad-hoc SQL.
+_COIN_IDS = {'BTC': 1, 'DOGE': 2, 'LTC': 3}
+_COIN_NAMES = {i: name for name, i in _COIN_IDS.items()}
+
+_DDL_TRANSACTIONS = """
+    CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tx_hash BLOB NOT NULL,
+        coin_type_id INTEGER NOT NULL,
+        wallet_address TEXT NOT NULL,
+        wallet_rank INTEGER,
+        amount_native REAL,
+        amount_usd REAL,
+        from_addresses TEXT,
+        to_addresses TEXT,
+        is_outgoing BOOLEAN,
+        is_exchange_related BOOLEAN,
+        exchange_id INTEGER,
+        block_height INTEGER,
+        confirmed BOOLEAN,
+        detected_at INTEGER NOT NULL DEFAULT (strftime('%s', 'now')),
+        month TEXT DEFAULT (strftime('%Y-%m', 'now')),
+        tx_timestamp TEXT,
+        UNIQUE(tx_hash, wallet_address)
+    )
+"""
+
+
+# Hot-path statements as module constants: sqlite3 caches prepared
+# statements keyed on the SQL text, so a single interned string per
+# query guarantees the cached plan is reused instead of re-preparing
+_SQL_INSERT_TX = """
+    INSERT INTO transactions (
+        tx_hash, coin_type_id, wallet_address, wallet_rank,
+        amount_native, amount_usd, from_addresses, to_addresses,
+        is_outgoing, is_exchange_related, exchange_id,
+        block_height, confirmed, tx_timestamp, detected_at, month
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+              CAST(strftime('%s', 'now') AS INTEGER), strftime('%Y-%m', 'now'))
+"""
+
+_SQL_INSERT_TX_IGNORE = _SQL_INSERT_TX.replace("INSERT INTO", "INSERT OR IGNORE INTO", 1)
+
+_SQL_INSERT_TXADDR = """
+    INSERT OR IGNORE INTO tx_addresses (tx_hash, address, direction)
+    VALUES (?, ?, ?)
+"""
+
+_SQL_UPSERT_TRACKING = """
+    INSERT INTO wallet_tracking (wallet_address, coin_type, wallet_rank, last_block_height, transaction_count)
+    VALUES (?, ?, ?, ?, 1)
+    ON CONFLICT(wallet_address, coin_type) DO UPDATE SET
+        last_block_height = MAX(last_block_height, ?),
+        last_checked = CURRENT_TIMESTAMP,
+        transaction_count = transaction_count + 1,
+        wallet_rank = COALESCE(?, wallet_rank)
+"""
+
+_SQL_LAST_BLOCK = """
+    SELECT last_block_height FROM wallet_tracking
+    WHERE wallet_address = ? AND coin_type = ?
+"""
+
+_SQL_RECENT_BY_COIN = """
+    SELECT * FROM transactions_v
+    WHERE coin_type_id = ? AND detected_at > strftime('%s', 'now') - ?
+    ORDER BY detected_at DESC
+    LIMIT ?
+"""
+
+_SQL_RECENT_ALL = """
+    SELECT * FROM transactions_v
+    WHERE detected_at > strftime('%s', 'now') - ?
+    ORDER BY detected_at DESC
+    LIMIT ?
+"""
+
+_SQL_EXCHANGE_FLOW = """
+    SELECT
+        COALESCE(SUM(CASE WHEN is_outgoing = 1 THEN amount_native END), 0) as inflow,
+        COALESCE(SUM(CASE WHEN is_outgoing = 0 THEN amount_native END), 0) as outflow
+    FROM transactions
+    WHERE coin_type_id = ? AND detected_at > strftime('%s', 'now') - ?
+    AND is_exchange_related = 1
+"""
+
+_SQL_SUMMARY_AGGREGATES = """
+    SELECT
+        COUNT(*) as tx_count,
+        COALESCE(SUM(amount_native), 0) as total_volume_native,
+        COALESCE(SUM(amount_usd), 0) as total_volume_usd,
+        COALESCE(SUM(CASE WHEN is_exchange_related = 1 AND is_outgoing = 1
+                          THEN amount_native ELSE 0 END), 0) as exchange_inflow,
+        COALESCE(SUM(CASE WHEN is_exchange_related = 1 AND is_outgoing = 0
+                          THEN amount_native ELSE 0 END), 0) as exchange_outflow,
+        COALESCE(SUM(CASE WHEN is_exchange_related = 1
+                          OR amount_native >= ?
+                          OR COALESCE(amount_usd, 0) >= ?
+                          THEN 1 ELSE 0 END), 0) as significant_count
+    FROM transactions
+    WHERE coin_type_id = ? AND detected_at > strftime('%s', 'now') - ?
+"""
+
+_SQL_MOST_ACTIVE = """
+    SELECT wallet_address, wallet_rank, COUNT(*) as tx_count,
+           SUM(amount_native) as total_volume
+    FROM transactions
+    WHERE coin_type_id = ? AND detected_at > strftime('%s', 'now') - ?
+    GROUP BY wallet_address
+    ORDER BY tx_count DESC
+    LIMIT ?
+"""
+
+_SQL_CLEANUP = """
+    DELETE FROM transactions WHERE detected_at < strftime('%s', 'now') - ?
+"""
+
+
+def _coin_id(coin_type):
+    """Map a coin name to its interned id (unknown values pass through)."""
+    return _COIN_IDS.get(coin_type, coin_type)
+
+
+def _pack_hash(tx_hash):
+    """Pack a hex transaction hash into its 32-byte raw form.
+
+    Halves the bytes stored and compared on the UNIQUE(tx_hash, ...)
+    dedup index. Non-hex identifiers (e.g. test fixtures) pass through
+    unchanged.
+    """
+    try:
+        return bytes.fromhex(tx_hash)
+    except (ValueError, TypeError):
+        return tx_hash
+
+
+def _unpack_hash(tx_hash):
+    """Convert a stored tx_hash back to its hex string form."""
+    return tx_hash.hex() if isinstance(tx_hash, bytes) else tx_hash
+
 
 class WhaleDatabase:
     """Manage whale transaction data storage."""
@@ -21,36 +179,60 @@ class WhaleDatabase:
 
     def _connect(self):
         """Establish database connection."""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # cached_statements raised from the default 100 so the prepared
+        # forms of all module-level _SQL_* constants stay cached
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                    cached_statements=256)
         self.conn.row_factory = sqlite3.Row  # Access columns by name
+
+        if not _HAS_FILTER:
+            print(f"[WARNING] SQLite {sqlite3.sqlite_version} < 3.30; "
+                  f"falling back to CASE-based aggregations")
+
+        # One executescript round-trip instead of a statement per pragma.
+        # page_size and auto_vacuum only take effect when set before the
+        # first tables are created (no-ops on an existing database); WAL
+        # keeps the cleanup delete from blocking readers and adds the
+        # .db-wal/.db-shm sidecar files next to the database, NORMAL
+        # drops one fsync per commit (safe in WAL), and the mmap/cache
+        # settings serve the digest aggregations from memory-mapped pages.
+        self.conn.executescript("""
+            PRAGMA page_size = 8192;
+            PRAGMA auto_vacuum = INCREMENTAL;
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA temp_store = MEMORY;
+            PRAGMA mmap_size = 268435456;  -- 256 MB
+            PRAGMA cache_size = -65536;    -- 64 MB
+            PRAGMA foreign_keys = ON;
+        """)
         print(f"[OK] Connected to database: {self.db_path}")
 
     def _create_tables(self):
         """Create database tables if they don't exist."""
         cursor = self.conn.cursor()
 
-        # Transactions table (30-day retention)
+        # Interning tables for the repeated short strings stored on every
+        # transaction row
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                tx_hash TEXT NOT NULL,
-                coin_type TEXT NOT NULL,
-                wallet_address TEXT NOT NULL,
-                wallet_rank INTEGER,
-                amount_native REAL,
-                amount_usd REAL,
-                from_addresses TEXT,
-                to_addresses TEXT,
-                is_outgoing BOOLEAN,
-                is_exchange_related BOOLEAN,
-                exchange_name TEXT,
-                block_height INTEGER,
-                confirmed BOOLEAN,
-                detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                tx_timestamp TEXT,
-                UNIQUE(tx_hash, wallet_address)
+            CREATE TABLE IF NOT EXISTS coin_types (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL
             )
         """)
+        cursor.executemany(
+            "INSERT OR IGNORE INTO coin_types (id, name) VALUES (?, ?)",
+            [(i, name) for name, i in _COIN_IDS.items()]
+        )
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS exchanges (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL
+            )
+        """)
+
+        # Transactions table (30-day retention)
+        cursor.execute(_DDL_TRANSACTIONS)
 
         # Wallet tracking table (last seen block height for each wallet)
         cursor.execute("""
@@ -85,6 +267,20 @@ class WhaleDatabase:
             )
         """)
 
+        # Normalized counterparty addresses (direction: 0 = from, 1 = to).
+        # The JSON columns on transactions are kept for display, but
+        # address-based queries ("who did X send to?") resolve here with
+        # an index probe instead of scanning JSON blobs.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tx_addresses (
+                tx_hash BLOB NOT NULL,
+                address TEXT NOT NULL,
+                direction INTEGER NOT NULL,
+                PRIMARY KEY (tx_hash, address, direction)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_txaddr_addr ON tx_addresses(address)")
+
         # Whale activity statistics (for unusual activity detection)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS whale_stats (
@@ -99,43 +295,185 @@ class WhaleDatabase:
             )
         """)
 
+        # Migrate detected_at values stored as ISO text (the old
+        # CURRENT_TIMESTAMP default) to integer unix-epoch seconds:
+        # range scans compare 8-byte integers instead of memcmp over
+        # ~19-byte strings, and every index carrying the column shrinks
+        cursor.execute("""
+            UPDATE transactions SET detected_at = CAST(strftime('%s', detected_at) AS INTEGER)
+            WHERE typeof(detected_at) = 'text'
+        """)
+
+        # Older databases predate the month column; backfill it so the
+        # monthly summary can use an index range scan instead of a full
+        # scan with per-row strftime
+        columns = {row['name'] for row in cursor.execute("PRAGMA table_info(transactions)")}
+        if 'month' not in columns:
+            cursor.execute("ALTER TABLE transactions ADD COLUMN month TEXT")
+        cursor.execute("""
+            UPDATE transactions SET month = strftime('%Y-%m', detected_at, 'unixepoch')
+            WHERE month IS NULL
+        """)
+
+        # Migrate tx_hash values stored as hex TEXT by older versions to
+        # raw BLOBs (halves the dedup index size); non-hex ids are left
+        # alone and keep working via the _pack_hash passthrough
+        rows = cursor.execute(
+            "SELECT id, tx_hash FROM transactions WHERE typeof(tx_hash) = 'text'"
+        ).fetchall()
+        packed = [(_pack_hash(r['tx_hash']), r['id']) for r in rows
+                  if isinstance(_pack_hash(r['tx_hash']), bytes)]
+        if packed:
+            cursor.executemany("UPDATE transactions SET tx_hash = ? WHERE id = ?", packed)
+            addr_rows = cursor.execute(
+                "SELECT DISTINCT tx_hash FROM tx_addresses WHERE typeof(tx_hash) = 'text'"
+            ).fetchall()
+            cursor.executemany(
+                "UPDATE OR IGNORE tx_addresses SET tx_hash = ? WHERE tx_hash = ?",
+                [(_pack_hash(r['tx_hash']), r['tx_hash']) for r in addr_rows
+                 if isinstance(_pack_hash(r['tx_hash']), bytes)]
+            )
+
+        # Rebuild databases that still store coin_type/exchange_name as
+        # TEXT on every row: intern the strings into the lookup tables
+        # and keep only integer ids in transactions
+        if 'coin_type' in columns:
+            cursor.execute("""
+                INSERT OR IGNORE INTO exchanges (name)
+                SELECT DISTINCT exchange_name FROM transactions
+                WHERE exchange_name IS NOT NULL
+            """)
+            cursor.execute("DROP VIEW IF EXISTS transactions_v")
+            cursor.execute("ALTER TABLE transactions RENAME TO transactions_old")
+            cursor.execute(_DDL_TRANSACTIONS)
+            cursor.execute("""
+                INSERT INTO transactions (
+                    id, tx_hash, coin_type_id, wallet_address, wallet_rank,
+                    amount_native, amount_usd, from_addresses, to_addresses,
+                    is_outgoing, is_exchange_related, exchange_id,
+                    block_height, confirmed, detected_at, month, tx_timestamp
+                )
+                SELECT o.id, o.tx_hash,
+                       CASE o.coin_type WHEN 'BTC' THEN 1 WHEN 'DOGE' THEN 2 WHEN 'LTC' THEN 3 END,
+                       o.wallet_address, o.wallet_rank, o.amount_native, o.amount_usd,
+                       o.from_addresses, o.to_addresses, o.is_outgoing, o.is_exchange_related,
+                       e.id, o.block_height, o.confirmed, o.detected_at, o.month, o.tx_timestamp
+                FROM transactions_old o
+                LEFT JOIN exchanges e ON e.name = o.exchange_name
+            """)
+            cursor.execute("DROP TABLE transactions_old")
+            print("[OK] Migrated transactions to interned coin/exchange ids")
+
+        # Back-compat read view resolving the interned ids to names;
+        # readers get coin_type/exchange_name columns as before
+        cursor.execute("""
+            CREATE VIEW IF NOT EXISTS transactions_v AS
+            SELECT t.*, c.name AS coin_type, e.name AS exchange_name
+            FROM transactions t
+            LEFT JOIN coin_types c ON c.id = t.coin_type_id
+            LEFT JOIN exchanges e ON e.id = t.exchange_id
+        """)
+
+        # Exchange-name intern cache for the insert path
+        self._exchange_ids = {
+            row['name']: row['id']
+            for row in cursor.execute("SELECT id, name FROM exchanges")
+        }
+
         # Create indexes for faster queries
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_coin_date ON transactions(coin_type, detected_at)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_wallet ON transactions(wallet_address, coin_type)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_exchange ON transactions(is_exchange_related, detected_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_coin_date ON transactions(coin_type_id, detected_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_wallet ON transactions(wallet_address, coin_type_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_detected_at ON transactions(detected_at)")
+        # Covers the exchange-flow and monthly-summary aggregations
+        # entirely from index entries (verify with EXPLAIN QUERY PLAN:
+        # "USING COVERING INDEX")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tx_flow_cover ON transactions(
+                coin_type_id, is_exchange_related, is_outgoing, detected_at, amount_native
+            )
+        """)
+        # Superseded by idx_tx_exch (partial) and idx_tx_flow_cover: a
+        # boolean lead column makes this one nearly useless to the planner
+        cursor.execute("DROP INDEX IF EXISTS idx_tx_exchange")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_month ON transactions(coin_type_id, month)")
+        # Partial index over only the exchange-related subset, keeping the
+        # exchange-flow scans proportional to that subset's size
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tx_exch ON transactions(coin_type_id, detected_at)
+            WHERE is_exchange_related = 1
+        """)
+        # Group-ordered covering index for the most-active-wallets query:
+        # with the wallet directly after the coin_type equality, the
+        # GROUP BY wallet_address reads pre-sorted groups and the SUM
+        # columns resolve from the index (no "USE TEMP B-TREE FOR GROUP
+        # BY" in EXPLAIN QUERY PLAN)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tx_coin_wallet_date ON transactions(
+                coin_type_id, wallet_address, detected_at, amount_native, wallet_rank
+            )
+        """)
+        # Covering index for the analyzer's hot time-window queries: the
+        # range filter, group-by and aggregated columns all resolve from
+        # the index without touching table rows
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tx_cov ON transactions(
+                coin_type_id, detected_at DESC, wallet_address,
+                is_outgoing, amount_native, amount_usd, is_exchange_related
+            )
+        """)
 
         self.conn.commit()
         print("[OK] Database tables created/verified")
 
+    @staticmethod
+    def _address_rows(tx_data: Dict):
+        """Yield tx_addresses rows for a transaction's counterparties."""
+        tx_hash = _pack_hash(tx_data['tx_hash'])
+        for addr in tx_data.get('from_addresses', []):
+            yield (tx_hash, addr, 0)
+        for addr in tx_data.get('to_addresses', []):
+            yield (tx_hash, addr, 1)
+
+    def _exchange_id(self, name: Optional[str]) -> Optional[int]:
+        """Intern an exchange name, returning its id (None passes through)."""
+        if not name:
+            return None
+        eid = self._exchange_ids.get(name)
+        if eid is None:
+            self.conn.execute("INSERT OR IGNORE INTO exchanges (name) VALUES (?)", (name,))
+            eid = self.conn.execute(
+                "SELECT id FROM exchanges WHERE name = ?", (name,)
+            ).fetchone()['id']
+            self._exchange_ids[name] = eid
+        return eid
+
+    def _insert_tx(self, cursor, tx_data: Dict):
+        """Run the transaction + counterparty inserts (no commit)."""
+        cursor.execute(_SQL_INSERT_TX, (
+            _pack_hash(tx_data['tx_hash']),
+            _coin_id(tx_data['coin_type']),
+            tx_data['wallet_address'],
+            tx_data.get('wallet_rank'),
+            tx_data['amount_native'],
+            tx_data.get('amount_usd'),
+            _dumps(tx_data.get('from_addresses', [])),
+            _dumps(tx_data.get('to_addresses', [])),
+            tx_data['is_outgoing'],
+            tx_data.get('is_exchange_related', False),
+            self._exchange_id(tx_data.get('exchange_name')),
+            tx_data.get('block_height'),
+            tx_data.get('confirmed', False),
+            tx_data.get('tx_timestamp')
+        ))
+
+        cursor.executemany(_SQL_INSERT_TXADDR, self._address_rows(tx_data))
+
     def add_transaction(self, tx_data: Dict) -> bool:
         """Add a new transaction to the database."""
         cursor = self.conn.cursor()
 
         try:
-            cursor.execute("""
-                INSERT INTO transactions (
-                    tx_hash, coin_type, wallet_address, wallet_rank,
-                    amount_native, amount_usd, from_addresses, to_addresses,
-                    is_outgoing, is_exchange_related, exchange_name,
-                    block_height, confirmed, tx_timestamp
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                tx_data['tx_hash'],
-                tx_data['coin_type'],
-                tx_data['wallet_address'],
-                tx_data.get('wallet_rank'),
-                tx_data['amount_native'],
-                tx_data.get('amount_usd'),
-                json.dumps(tx_data.get('from_addresses', [])),
-                json.dumps(tx_data.get('to_addresses', [])),
-                tx_data['is_outgoing'],
-                tx_data.get('is_exchange_related', False),
-                tx_data.get('exchange_name'),
-                tx_data.get('block_height'),
-                tx_data.get('confirmed', False),
-                tx_data.get('tx_timestamp')
-            ))
-
+            self._insert_tx(cursor, tx_data)
             self.conn.commit()
             return True
 
@@ -146,58 +484,245 @@ class WhaleDatabase:
             print(f"[ERROR] Failed to add transaction: {e}")
             return False
 
-    def update_wallet_tracking(self, wallet_address: str, coin_type: str,
-                               block_height: int, wallet_rank: int = None):
-        """Update the last seen block height for a wallet."""
+    def record_tx(self, tx_data: Dict) -> bool:
+        """Insert a transaction and bump its wallet tracking in one commit.
+
+        The polling loop used to call add_transaction and
+        update_wallet_tracking back-to-back per detected transaction —
+        two transactions and two fsyncs where one suffices. Both
+        statements run inside a single `with self.conn:` block here.
+
+        Returns True if the transaction was newly inserted.
+        """
         cursor = self.conn.cursor()
 
-        cursor.execute("""
-            INSERT INTO wallet_tracking (wallet_address, coin_type, wallet_rank, last_block_height, transaction_count)
-            VALUES (?, ?, ?, ?, 1)
-            ON CONFLICT(wallet_address, coin_type) DO UPDATE SET
-                last_block_height = MAX(last_block_height, ?),
-                last_checked = CURRENT_TIMESTAMP,
-                transaction_count = transaction_count + 1,
-                wallet_rank = COALESCE(?, wallet_rank)
-        """, (wallet_address, coin_type, wallet_rank, block_height, block_height, wallet_rank))
+        try:
+            with self.conn:
+                self._insert_tx(cursor, tx_data)
+                if tx_data.get('block_height', 0) > 0:
+                    self._upsert_tracking(
+                        cursor,
+                        tx_data['wallet_address'],
+                        tx_data['coin_type'],
+                        tx_data['block_height'],
+                        tx_data.get('wallet_rank')
+                    )
+            return True
+
+        except sqlite3.IntegrityError:
+            # Transaction already exists
+            return False
+        except Exception as e:
+            print(f"[ERROR] Failed to record transaction: {e}")
+            return False
+
+    def _batch_params(self, tx_list: List[Dict]):
+        """Yield insert parameter tuples for a transaction batch.
+
+        Exchange names are interned up front so the generator only does
+        cache lookups while executemany is running.
+        """
+        for name in {tx.get('exchange_name') for tx in tx_list}:
+            self._exchange_id(name)
+
+        return (
+            (
+                _pack_hash(tx['tx_hash']),
+                _coin_id(tx['coin_type']),
+                tx['wallet_address'],
+                tx.get('wallet_rank'),
+                tx['amount_native'],
+                tx.get('amount_usd'),
+                _dumps(tx.get('from_addresses', [])),
+                _dumps(tx.get('to_addresses', [])),
+                tx['is_outgoing'],
+                tx.get('is_exchange_related', False),
+                self._exchange_ids.get(tx.get('exchange_name')),
+                tx.get('block_height'),
+                tx.get('confirmed', False),
+                tx.get('tx_timestamp')
+            )
+            for tx in tx_list
+        )
 
+    def add_transactions(self, tx_list: List[Dict]) -> int:
+        """
+        Add a batch of transactions with one commit.
+
+        executemany reuses the prepared statement across rows and the
+        single enclosing transaction means one fsync for the whole batch
+        instead of one per row. Duplicates are skipped by INSERT OR
+        IGNORE rather than raising IntegrityError per row.
+
+        Returns the number of rows actually inserted.
+        """
+        if not tx_list:
+            return 0
+
+        params = self._batch_params(tx_list)
+
+        try:
+            with self.conn:
+                cursor = self.conn.executemany(_SQL_INSERT_TX_IGNORE, params)
+                inserted = cursor.rowcount
+                self.conn.executemany(
+                    _SQL_INSERT_TXADDR,
+                    (row for tx in tx_list for row in self._address_rows(tx))
+                )
+            return inserted
+
+        except Exception as e:
+            print(f"[ERROR] Failed to add transaction batch: {e}")
+            return 0
+
+    def record_transactions(self, tx_list: List[Dict]) -> int:
+        """
+        Insert a batch of transactions and their tracking upserts in one commit.
+
+        Batch analog of record_tx for the polling cycle: every insert and
+        wallet_tracking upsert for the cycle shares one transaction, so a
+        busy cycle costs one fsync instead of one per detected transaction.
+
+        Returns the number of transactions actually inserted.
+        """
+        if not tx_list:
+            return 0
+
+        params = self._batch_params(tx_list)
+        tracking = [
+            (tx['wallet_address'], tx['coin_type'], tx.get('wallet_rank'),
+             tx['block_height'], tx['block_height'], tx.get('wallet_rank'))
+            for tx in tx_list if tx.get('block_height', 0) > 0
+        ]
+
+        try:
+            with self.conn:
+                cursor = self.conn.executemany(_SQL_INSERT_TX_IGNORE, params)
+                inserted = cursor.rowcount
+                self.conn.executemany(
+                    _SQL_INSERT_TXADDR,
+                    (row for tx in tx_list for row in self._address_rows(tx))
+                )
+                if tracking:
+                    self.conn.executemany(_SQL_UPSERT_TRACKING, tracking)
+            return inserted
+
+        except Exception as e:
+            print(f"[ERROR] Failed to record transaction batch: {e}")
+            return 0
+
+    @staticmethod
+    def _upsert_tracking(cursor, wallet_address: str, coin_type: str,
+                         block_height: int, wallet_rank: int = None):
+        """Run the wallet tracking upsert (no commit)."""
+        cursor.execute(_SQL_UPSERT_TRACKING,
+                       (wallet_address, coin_type, wallet_rank, block_height,
+                        block_height, wallet_rank))
+
+    def update_wallet_tracking(self, wallet_address: str, coin_type: str,
+                               block_height: int, wallet_rank: int = None):
+        """Update the last seen block height for a wallet."""
+        self._upsert_tracking(self.conn.cursor(), wallet_address, coin_type,
+                              block_height, wallet_rank)
         self.conn.commit()
 
     def get_wallet_last_block(self, wallet_address: str, coin_type: str) -> int:
         """Get the last seen block height for a wallet."""
         cursor = self.conn.cursor()
 
-        cursor.execute("""
-            SELECT last_block_height FROM wallet_tracking
-            WHERE wallet_address = ? AND coin_type = ?
-        """, (wallet_address, coin_type))
+        cursor.execute(_SQL_LAST_BLOCK, (wallet_address, coin_type))
 
         result = cursor.fetchone()
         return result['last_block_height'] if result else 0
 
-    def get_recent_transactions(self, coin_type: str = None, hours: int = 24,
-                                limit: int = 100) -> List[Dict]:
-        """Get recent transactions, optionally filtered by coin type."""
+    def get_wallet_last_blocks(self, addresses: List[str], coin_type: str) -> Dict[str, int]:
+        """
+        Get last seen block heights for a batch of wallets in one query.
+
+        Untracked addresses come back as 0, matching what
+        get_wallet_last_block returns for them.
+        """
+        if not addresses:
+            return {}
+
+        cursor = self.conn.cursor()
+
+        placeholders = ', '.join('?' for _ in addresses)
+        cursor.execute(f"""
+            SELECT wallet_address, last_block_height FROM wallet_tracking
+            WHERE coin_type = ? AND wallet_address IN ({placeholders})
+        """, [coin_type, *addresses])
+
+        found = {row['wallet_address']: row['last_block_height'] for row in cursor.fetchall()}
+        return {address: found.get(address, 0) for address in addresses}
+
+    def existing_tx_hashes(self, tx_hashes: List[str]) -> set:
+        """Return the subset of the given transaction hashes already stored.
+
+        Lets the monitor skip processing entirely for transactions the
+        API re-returns that are already persisted; the UNIQUE index
+        answers the IN-list probe without a scan.
+        """
+        if not tx_hashes:
+            return set()
+
         cursor = self.conn.cursor()
 
-        since = datetime.now() - timedelta(hours=hours)
+        placeholders = ', '.join('?' for _ in tx_hashes)
+        cursor.execute(f"""
+            SELECT DISTINCT tx_hash FROM transactions
+            WHERE tx_hash IN ({placeholders})
+        """, [_pack_hash(h) for h in tx_hashes])
+
+        return {_unpack_hash(row['tx_hash']) for row in cursor.fetchall()}
+
+    def get_last_blocks(self, coin_type: str) -> Dict[str, int]:
+        """Get last seen block heights for every tracked wallet of a coin.
+
+        One query per coin per cycle; addresses the monitor has never
+        tracked simply won't appear (callers treat missing as 0).
+        """
+        cursor = self.conn.cursor()
+
+        cursor.execute("""
+            SELECT wallet_address, last_block_height FROM wallet_tracking
+            WHERE coin_type = ?
+        """, (coin_type,))
+
+        return {row['wallet_address']: row['last_block_height'] for row in cursor.fetchall()}
+
+    def iter_recent_transactions(self, coin_type: str = None, hours: int = 24,
+                                 limit: int = 100) -> Iterator[Dict]:
+        """Yield recent transactions lazily, optionally filtered by coin type.
+
+        Rows are pulled in fixed-size batches and yielded one dict at a
+        time, so streaming consumers never hold the whole result set.
+        """
+        cursor = self.conn.cursor()
+
+        # The cutoff is computed by SQLite itself (in UTC, matching the
+        # stored unix-epoch values) rather than binding a local Python
+        # datetime; the window is bound in seconds
+        since = hours * 3600
 
         if coin_type:
-            cursor.execute("""
-                SELECT * FROM transactions
-                WHERE coin_type = ? AND detected_at > ?
-                ORDER BY detected_at DESC
-                LIMIT ?
-            """, (coin_type, since, limit))
+            cursor.execute(_SQL_RECENT_BY_COIN, (_coin_id(coin_type), since, limit))
         else:
-            cursor.execute("""
-                SELECT * FROM transactions
-                WHERE detected_at > ?
-                ORDER BY detected_at DESC
-                LIMIT ?
-            """, (since, limit))
+            cursor.execute(_SQL_RECENT_ALL, (since, limit))
 
-        return [dict(row) for row in cursor.fetchall()]
+        while True:
+            batch = cursor.fetchmany(256)
+            if not batch:
+                break
+            for row in batch:
+                tx = dict(row)
+                tx['tx_hash'] = _unpack_hash(tx['tx_hash'])
+                yield tx
+
+    def get_recent_transactions(self, coin_type: str = None, hours: int = 24,
+                                limit: int = 100) -> List[Dict]:
+        """Get recent transactions as a list (see iter_recent_transactions)."""
+        return list(self.iter_recent_transactions(coin_type, hours, limit))
 
     def get_todays_transactions(self, coin_type: str = None) -> List[Dict]:
         """Get all transactions from today."""
@@ -210,60 +735,216 @@ class WhaleDatabase:
         Returns: (inflow, outflow) in native currency
         """
         cursor = self.conn.cursor()
-        since = datetime.now() - timedelta(hours=hours)
 
-        # Inflow: transactions TO exchanges (is_outgoing = True, is_exchange_related = True)
-        cursor.execute("""
-            SELECT COALESCE(SUM(amount_native), 0) as total
+        # Both directions in one pass over the exchange-related subset
+        # (see idx_tx_exch): inflow is coins sent TO exchanges
+        # (is_outgoing = 1), outflow is coins received FROM them
+        cursor.execute(_SQL_EXCHANGE_FLOW, (_coin_id(coin_type), hours * 3600))
+
+        row = cursor.fetchone()
+        return (row['inflow'], row['outflow'])
+
+    def get_candidate_significant(self, coin_type: Optional[str], hours: int,
+                                  thresholds: Dict[str, Dict],
+                                  unusual_multiplier: float = 3.0) -> List[Dict]:
+        """
+        Fetch recent transactions with significance signals computed in SQL.
+
+        One query computes, per transaction: the large-tx predicate, the
+        unusual-activity check (recent count vs. 30-day daily average), and
+        the 7-day accumulation/distribution pattern. Replaces the per-row
+        queries the analyzer used to issue for each transaction.
+
+        Returns rows with extra columns: is_large, is_unusual, pattern.
+        """
+        cursor = self.conn.cursor()
+
+        since_recent = hours * 3600
+        since_hist = 30 * 86400
+        since_flow = 7 * 86400
+
+        # Per-coin thresholds as an inline VALUES table (keyed by coin id)
+        thresh_rows = []
+        thresh_params = []
+        for coin, limits in thresholds.items():
+            thresh_rows.append("(?, ?, ?)")
+            thresh_params.extend([
+                _coin_id(coin),
+                limits.get('large_tx', float('inf')),
+                limits.get('usd', float('inf'))
+            ])
+
+        coin_filter = "AND coin_type_id = ?" if coin_type else ""
+
+        query = f"""
+            WITH thresh(coin_type_id, large_native, large_usd) AS (
+                VALUES {', '.join(thresh_rows)}
+            ),
+            recent AS (
+                SELECT * FROM transactions_v
+                WHERE detected_at > strftime('%s', 'now') - ? {coin_filter}
+            ),
+            activity AS (
+                SELECT wallet_address, coin_type_id, COUNT(*) AS recent_count
+                FROM recent
+                GROUP BY wallet_address, coin_type_id
+            ),
+            hist AS (
+                SELECT wallet_address, coin_type_id,
+                       COUNT(*) AS hist_count,
+                       (strftime('%s', 'now') - MIN(detected_at)) / 86400.0 AS hist_days
+                FROM transactions
+                WHERE detected_at > strftime('%s', 'now') - ?
+                GROUP BY wallet_address, coin_type_id
+            ),
+            flows AS (
+                SELECT wallet_address, coin_type_id,
+                       SUM(CASE WHEN is_outgoing = 0 THEN amount_native ELSE 0 END) AS inflow,
+                       SUM(CASE WHEN is_outgoing = 1 THEN amount_native ELSE 0 END) AS outflow
+                FROM transactions
+                WHERE detected_at > strftime('%s', 'now') - ?
+                GROUP BY wallet_address, coin_type_id
+            )
+            SELECT r.*,
+                CASE WHEN r.amount_native >= t.large_native
+                          OR COALESCE(r.amount_usd, 0) >= t.large_usd
+                     THEN 1 ELSE 0 END AS is_large,
+                CASE WHEN h.hist_days > 0
+                          AND a.recent_count > (h.hist_count / h.hist_days) * (? / 24.0) * ?
+                     THEN 1 ELSE 0 END AS is_unusual,
+                CASE WHEN f.inflow IS NULL THEN NULL
+                     WHEN ABS(COALESCE(f.inflow, 0) - COALESCE(f.outflow, 0))
+                          < MAX(COALESCE(f.inflow, 0), COALESCE(f.outflow, 0)) * 0.1 THEN NULL
+                     WHEN COALESCE(f.inflow, 0) > COALESCE(f.outflow, 0) THEN 'accumulating'
+                     ELSE 'distributing' END AS pattern
+            FROM recent r
+            LEFT JOIN thresh t ON t.coin_type_id = r.coin_type_id
+            LEFT JOIN activity a ON a.wallet_address = r.wallet_address
+                                AND a.coin_type_id = r.coin_type_id
+            LEFT JOIN hist h ON h.wallet_address = r.wallet_address
+                            AND h.coin_type_id = r.coin_type_id
+            LEFT JOIN flows f ON f.wallet_address = r.wallet_address
+                             AND f.coin_type_id = r.coin_type_id
+            ORDER BY r.detected_at DESC
+        """
+
+        params = thresh_params + [since_recent]
+        if coin_type:
+            params.append(_coin_id(coin_type))
+        params.extend([since_hist, since_flow, hours, unusual_multiplier])
+
+        cursor.execute(query, params)
+        results = []
+        for row in cursor.fetchall():
+            tx = dict(row)
+            tx['tx_hash'] = _unpack_hash(tx['tx_hash'])
+            results.append(tx)
+        return results
+
+    def get_wallet_hist_stats(self, wallets: List[Tuple[str, str]], days: int = 30) -> Dict[Tuple[str, str], Dict]:
+        """
+        Get 30-day transaction counts for a batch of wallets in one query.
+
+        Args:
+            wallets: List of (wallet_address, coin_type) pairs
+
+        Returns:
+            Dict keyed by (wallet_address, coin_type) with total_count/days
+        """
+        if not wallets:
+            return {}
+
+        cursor = self.conn.cursor()
+
+        placeholders = ', '.join('(?, ?)' for _ in wallets)
+        params = [v for wallet, coin in wallets for v in (wallet, _coin_id(coin))]
+
+        cursor.execute(f"""
+            SELECT wallet_address, coin_type_id,
+                   COUNT(*) as total_count,
+                   (strftime('%s', 'now') - MIN(detected_at)) / 86400.0 as days
             FROM transactions
-            WHERE coin_type = ? AND detected_at > ?
-            AND is_exchange_related = 1 AND is_outgoing = 1
-        """, (coin_type, since))
+            WHERE (wallet_address, coin_type_id) IN (VALUES {placeholders})
+            AND detected_at > strftime('%s', 'now') - ?
+            GROUP BY wallet_address, coin_type_id
+        """, params + [days * 86400])
 
-        inflow = cursor.fetchone()['total']
+        return {
+            (row['wallet_address'], _COIN_NAMES.get(row['coin_type_id'])): dict(row)
+            for row in cursor.fetchall()
+        }
 
-        # Outflow: transactions FROM exchanges (is_outgoing = False, is_exchange_related = True)
-        cursor.execute("""
-            SELECT COALESCE(SUM(amount_native), 0) as total
+    def get_wallet_flow_stats(self, wallets: List[Tuple[str, str]], days: int = 7) -> Dict[Tuple[str, str], Dict]:
+        """
+        Get net exchange flows (inflow/outflow) for a batch of wallets in one query.
+
+        Args:
+            wallets: List of (wallet_address, coin_type) pairs
+
+        Returns:
+            Dict keyed by (wallet_address, coin_type) with inflow/outflow
+        """
+        if not wallets:
+            return {}
+
+        cursor = self.conn.cursor()
+
+        placeholders = ', '.join('(?, ?)' for _ in wallets)
+        params = [v for wallet, coin in wallets for v in (wallet, _coin_id(coin))]
+
+        cursor.execute(f"""
+            SELECT wallet_address, coin_type_id,
+                   SUM(CASE WHEN is_outgoing = 0 THEN amount_native ELSE 0 END) as inflow,
+                   SUM(CASE WHEN is_outgoing = 1 THEN amount_native ELSE 0 END) as outflow
             FROM transactions
-            WHERE coin_type = ? AND detected_at > ?
-            AND is_exchange_related = 1 AND is_outgoing = 0
-        """, (coin_type, since))
+            WHERE (wallet_address, coin_type_id) IN (VALUES {placeholders})
+            AND detected_at > strftime('%s', 'now') - ?
+            GROUP BY wallet_address, coin_type_id
+        """, params + [days * 86400])
 
-        outflow = cursor.fetchone()['total']
+        return {
+            (row['wallet_address'], _COIN_NAMES.get(row['coin_type_id'])): dict(row)
+            for row in cursor.fetchall()
+        }
 
-        return (inflow, outflow)
+    def get_summary_aggregates(self, coin_type: str, hours: int = 24,
+                               large_tx_native: float = float('inf'),
+                               large_tx_usd: float = float('inf')) -> Dict:
+        """
+        Compute digest summary aggregates for a time period in one query.
+
+        Returns a dict with tx_count, total volumes, exchange in/outflow
+        and the count of significant (large or exchange-related) moves,
+        without materializing the underlying rows in Python.
+        """
+        cursor = self.conn.cursor()
+
+        cursor.execute(_SQL_SUMMARY_AGGREGATES,
+                       (large_tx_native, large_tx_usd, _coin_id(coin_type), hours * 3600))
+
+        return dict(cursor.fetchone())
 
     def get_most_active_wallets(self, coin_type: str, hours: int = 24, limit: int = 5) -> List[Dict]:
         """Get most active wallets in a time period."""
         cursor = self.conn.cursor()
-        since = datetime.now() - timedelta(hours=hours)
 
-        cursor.execute("""
-            SELECT wallet_address, wallet_rank, COUNT(*) as tx_count,
-                   SUM(amount_native) as total_volume
-            FROM transactions
-            WHERE coin_type = ? AND detected_at > ?
-            GROUP BY wallet_address
-            ORDER BY tx_count DESC
-            LIMIT ?
-        """, (coin_type, since, limit))
+        cursor.execute(_SQL_MOST_ACTIVE, (_coin_id(coin_type), hours * 3600, limit))
 
         return [dict(row) for row in cursor.fetchall()]
 
     def cleanup_old_transactions(self, days: int = 30):
         """Delete transactions older than specified days."""
         cursor = self.conn.cursor()
-        cutoff = datetime.now() - timedelta(days=days)
 
-        cursor.execute("""
-            DELETE FROM transactions WHERE detected_at < ?
-        """, (cutoff,))
+        # One indexed range delete (see idx_tx_detected_at), no per-row work
+        cursor.execute(_SQL_CLEANUP, (days * 86400,))
 
         deleted = cursor.rowcount
         self.conn.commit()
 
         if deleted > 0:
+            # Reclaim freed pages incrementally instead of a full VACUUM
+            cursor.execute("PRAGMA incremental_vacuum(1000)")
             print(f"[OK] Cleaned up {deleted} old transactions")
 
     def create_monthly_summary(self, month: str, coin_type: str):
@@ -271,17 +952,30 @@ class WhaleDatabase:
         cursor = self.conn.cursor()
 
         # Get transactions for the month
-        cursor.execute("""
-            SELECT
-                COUNT(*) as tx_count,
-                SUM(amount_native) as total_volume_native,
-                SUM(amount_usd) as total_volume_usd,
-                SUM(CASE WHEN is_exchange_related = 1 AND is_outgoing = 1 THEN amount_native ELSE 0 END) as exchange_inflow,
-                SUM(CASE WHEN is_exchange_related = 1 AND is_outgoing = 0 THEN amount_native ELSE 0 END) as exchange_outflow,
-                SUM(CASE WHEN amount_usd > 100000 THEN 1 ELSE 0 END) as significant_count
-            FROM transactions
-            WHERE coin_type = ? AND strftime('%Y-%m', detected_at) = ?
-        """, (coin_type, month))
+        if _HAS_FILTER:
+            cursor.execute("""
+                SELECT
+                    COUNT(*) as tx_count,
+                    SUM(amount_native) as total_volume_native,
+                    SUM(amount_usd) as total_volume_usd,
+                    COALESCE(SUM(amount_native) FILTER (WHERE is_exchange_related = 1 AND is_outgoing = 1), 0) as exchange_inflow,
+                    COALESCE(SUM(amount_native) FILTER (WHERE is_exchange_related = 1 AND is_outgoing = 0), 0) as exchange_outflow,
+                    COUNT(*) FILTER (WHERE amount_usd > 100000) as significant_count
+                FROM transactions
+                WHERE coin_type_id = ? AND month = ?
+            """, (_coin_id(coin_type), month))
+        else:
+            cursor.execute("""
+                SELECT
+                    COUNT(*) as tx_count,
+                    SUM(amount_native) as total_volume_native,
+                    SUM(amount_usd) as total_volume_usd,
+                    SUM(CASE WHEN is_exchange_related = 1 AND is_outgoing = 1 THEN amount_native ELSE 0 END) as exchange_inflow,
+                    SUM(CASE WHEN is_exchange_related = 1 AND is_outgoing = 0 THEN amount_native ELSE 0 END) as exchange_outflow,
+                    SUM(CASE WHEN amount_usd > 100000 THEN 1 ELSE 0 END) as significant_count
+                FROM transactions
+                WHERE coin_type_id = ? AND month = ?
+            """, (_coin_id(coin_type), month))
 
         stats = dict(cursor.fetchone())
 
@@ -289,11 +983,11 @@ class WhaleDatabase:
         cursor.execute("""
             SELECT wallet_address, wallet_rank, COUNT(*) as tx_count
             FROM transactions
-            WHERE coin_type = ? AND strftime('%Y-%m', detected_at) = ?
+            WHERE coin_type_id = ? AND month = ?
             GROUP BY wallet_address
             ORDER BY tx_count DESC
             LIMIT 10
-        """, (coin_type, month))
+        """, (_coin_id(coin_type), month))
 
         active_wallets = [dict(row) for row in cursor.fetchall()]
 
@@ -322,6 +1016,14 @@ class WhaleDatabase:
     def close(self):
         """Close database connection."""
         if self.conn:
+            try:
+                # Refresh planner statistics for the next process, then
+                # fold the WAL sidecar back into the main file so it
+                # can't grow unbounded across long-running sessions
+                self.conn.execute("PRAGMA optimize")
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error as e:
+                print(f"[WARNING] Close-time maintenance skipped: {e}")
             self.conn.close()
             print("[OK] Database connection closed")
 
@@ -2,7 +2,10 @@
 Whale transaction monitor - core monitoring logic.
 Polls blockchain APIs and detects new whale transactions.
 """
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import List, Dict, Optional
 from datetime import datetime
 
@@ -12,6 +15,37 @@ from database import WhaleDatabase
 from exchange_db import ExchangeDatabase
 
 
+@dataclass(slots=True)
+class ProcessedTx:
+    """A detected whale transaction, normalized for storage and alerting.
+
+    Slots cut the per-transaction footprint roughly in half versus the
+    14-key dict this used to be and make field access an attribute load.
+    The mapping-style shims below keep the database layer and notifier
+    working unchanged for both dicts and ProcessedTx instances.
+    """
+    tx_hash: str
+    coin_type: str
+    wallet_address: str
+    wallet_rank: Optional[int]
+    amount_native: float
+    amount_usd: Optional[float]
+    from_addresses: List[str]
+    to_addresses: List[str]
+    is_outgoing: bool
+    is_exchange_related: bool
+    exchange_name: Optional[str]
+    block_height: int
+    confirmed: bool
+    tx_timestamp: str
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
 class WhaleMonitor:
     """Monitor whale wallets for new transactions."""
 
@@ -37,13 +71,20 @@ class WhaleMonitor:
             'last_check_time': None
         }
 
-    def check_wallet(self, wallet: Dict, coin_type: str) -> List[Dict]:
+        # Chain tip seen per coin on the previous cycle: confirmed wallet
+        # activity requires a new block, so an unchanged tip lets a cycle
+        # skip that coin's wallet scan entirely
+        self._chain_heights = {}
+
+    def check_wallet(self, wallet: Dict, coin_type: str,
+                     current_price: Optional[float] = None) -> List[ProcessedTx]:
         """
         Check a single wallet for new transactions.
 
         Args:
             wallet: Wallet dict with address, rank, etc.
             coin_type: 'BTC', 'DOGE', or 'LTC'
+            current_price: Spot USD price, if already fetched this cycle
 
         Returns:
             List of new transactions
@@ -66,23 +107,24 @@ class WhaleMonitor:
             if not transactions:
                 return []
 
-            # Process each transaction
+            # Process each transaction, skipping hashes already persisted
             new_txs = []
-            current_price = self.api_client.get_price(coin_type)
+            if current_price is None:
+                current_price = self.api_client.get_price(coin_type)
+
+            seen = self.database.existing_tx_hashes([tx['hash'] for tx in transactions])
 
             for tx in transactions:
+                if tx['hash'] in seen:
+                    continue
                 processed_tx = self._process_transaction(tx, address, rank, coin_type, current_price)
                 if processed_tx:
                     new_txs.append(processed_tx)
 
-                    # Add to database
-                    if self.database.add_transaction(processed_tx):
+                    # Insert + tracking upsert share one commit
+                    if self.database.record_tx(processed_tx):
                         self.stats['new_transactions'] += 1
 
-                    # Update last seen block
-                    if tx.get('block_height', 0) > last_block:
-                        self.database.update_wallet_tracking(address, coin_type, tx['block_height'], rank)
-
             return new_txs
 
         except Exception as e:
@@ -90,115 +132,209 @@ class WhaleMonitor:
             self.stats['api_errors'] += 1
             return []
 
+    def check_wallet_group(self, wallets: List[Dict], coin_type: str,
+                           current_price: Optional[float] = None,
+                           last_blocks: Optional[Dict[str, int]] = None) -> List[ProcessedTx]:
+        """
+        Check a group of wallets with batched API requests.
+
+        Last-seen block heights come from one bulk SELECT (or the
+        cycle-wide snapshot passed in by check_all_wallets), and the
+        wallets are packed into multi-address BlockCypher requests
+        (~25 per round trip) instead of one request per wallet. The spot
+        price is passed in by the cycle so groups don't re-fetch it.
+
+        Returns:
+            List of new transactions across the group
+        """
+        ranks = {wallet['address']: wallet['rank'] for wallet in wallets}
+        if last_blocks is None:
+            last_blocks = self.database.get_wallet_last_blocks(list(ranks), coin_type)
+        else:
+            last_blocks = {address: last_blocks.get(address, 0) for address in ranks}
+
+        # First-time wallets only need their latest transaction; tracked
+        # ones fetch everything past their last seen block
+        untracked = [a for a, block in last_blocks.items() if block == 0]
+        tracked = {a: block for a, block in last_blocks.items() if block > 0}
+
+        new_txs = []
+        try:
+            fetched = {}
+            if untracked:
+                fetched.update(self.api_client.get_address_transactions_batch(
+                    untracked, coin_type, limit=1))
+            if tracked:
+                fetched.update(self.api_client.get_latest_transactions_batch(
+                    list(tracked), coin_type, tracked))
+
+            if current_price is None:
+                current_price = self.api_client.get_price(coin_type)
+
+            # One IN-list probe tells us which returned hashes are
+            # already persisted, so re-returned transactions never reach
+            # _process_transaction at all
+            seen = self.database.existing_tx_hashes(
+                [tx['hash'] for txs in fetched.values() for tx in txs])
+
+            # Processed transactions are only accumulated here; the cycle
+            # persists them in one batch (see check_all_wallets)
+            for address, transactions in fetched.items():
+                for tx in transactions:
+                    if tx['hash'] in seen:
+                        continue
+                    processed_tx = self._process_transaction(
+                        tx, address, ranks.get(address), coin_type, current_price)
+                    if processed_tx:
+                        new_txs.append(processed_tx)
+
+            return new_txs
+
+        except Exception as e:
+            print(f"[ERROR] Failed to check {len(wallets)} {coin_type} wallets: {e}")
+            self.stats['api_errors'] += 1
+            return new_txs
+
     def _process_transaction(self, tx: Dict, wallet_address: str, wallet_rank: int,
-                            coin_type: str, current_price: Optional[float]) -> Optional[Dict]:
+                            coin_type: str, current_price: Optional[float]) -> Optional[ProcessedTx]:
         """Process a raw transaction and extract relevant information."""
 
-        # Determine transaction direction and amount
+        # One fused pass per side: each walk collects the address list,
+        # tests wallet membership and accumulates the amount together,
+        # instead of separate traversals for each. Dense BTC txs carry
+        # hundreds of inputs/outputs.
         is_outgoing = False
-        amount_native = 0
-
-        # Check inputs to see if this wallet is sending
-        for inp in tx.get('inputs', []):
-            addresses = inp.get('addresses', []) or []
-            for addr in addresses:
-                if addr == wallet_address:
-                    is_outgoing = True
-                    # Sum up the amounts
-                    amount_native += inp.get('output_value', 0) / 1e8
-
-        # If not outgoing, it's incoming - sum outputs to this wallet
-        if not is_outgoing:
-            for out in tx.get('outputs', []):
-                addresses = out.get('addresses', []) or []
-                for addr in addresses:
-                    if addr == wallet_address:
-                        amount_native += out.get('value', 0) / 1e8
-
-        # If no amount, skip
-        if amount_native == 0:
-            return None
-
-        # Get all from/to addresses
+        amount = 0
         from_addresses = []
         to_addresses = []
 
-        for inp in tx.get('inputs', []):
-            addresses = inp.get('addresses', []) or []
+        for inp in tx.get('inputs', ()):
+            addresses = inp.get('addresses') or ()
             from_addresses.extend(addresses)
+            if wallet_address in addresses:
+                is_outgoing = True
+                amount += inp.get('output_value', 0)
 
-        for out in tx.get('outputs', []):
-            addresses = out.get('addresses', []) or []
+        for out in tx.get('outputs', ()):
+            addresses = out.get('addresses') or ()
             to_addresses.extend(addresses)
+            # Not outgoing means incoming - sum outputs to this wallet
+            if not is_outgoing and wallet_address in addresses:
+                amount += out.get('value', 0)
+
+        amount_native = amount / 1e8
+
+        # If no amount, skip
+        if amount_native == 0:
+            return None
 
-        # Check if exchange-related
-        is_exchange_related = False
-        exchange_name = None
+        # Classify the whole counterparty set against the exchange list
+        # in one intersection instead of per-address lookups; the splat
+        # build skips the throwaway concatenated list and the wallet's
+        # own address is excluded up front
+        counterparties = {*from_addresses, *to_addresses} - {wallet_address}
+        matches = self.exchange_db.classify_bulk(counterparties, coin_type)
 
-        # Check if any address is an exchange
-        all_addresses = set(from_addresses + to_addresses)
-        for addr in all_addresses:
-            if addr != wallet_address:
-                if self.exchange_db.is_exchange_address(addr, coin_type):
-                    is_exchange_related = True
-                    exchange_name = self.exchange_db.get_exchange_name(addr, coin_type)
-                    break
+        is_exchange_related = bool(matches)
+        exchange_name = next(iter(matches.values())) if matches else None
 
         # Calculate USD value
         amount_usd = None
         if current_price:
             amount_usd = amount_native * current_price
 
-        return {
-            'tx_hash': tx['hash'],
-            'coin_type': coin_type,
-            'wallet_address': wallet_address,
-            'wallet_rank': wallet_rank,
-            'amount_native': amount_native,
-            'amount_usd': amount_usd,
-            'from_addresses': from_addresses,
-            'to_addresses': to_addresses,
-            'is_outgoing': is_outgoing,
-            'is_exchange_related': is_exchange_related,
-            'exchange_name': exchange_name,
-            'block_height': tx.get('block_height', -1),
-            'confirmed': tx.get('confirmed', False),
-            'tx_timestamp': tx.get('received', datetime.now().isoformat())
-        }
+        return ProcessedTx(
+            tx_hash=tx['hash'],
+            coin_type=coin_type,
+            wallet_address=wallet_address,
+            wallet_rank=wallet_rank,
+            amount_native=amount_native,
+            amount_usd=amount_usd,
+            from_addresses=from_addresses,
+            to_addresses=to_addresses,
+            is_outgoing=is_outgoing,
+            is_exchange_related=is_exchange_related,
+            exchange_name=exchange_name,
+            block_height=tx.get('block_height', -1),
+            confirmed=tx.get('confirmed', False),
+            # Short-circuit: the datetime.now().isoformat() fallback only
+            # runs when the API omitted 'received', not on every tx
+            tx_timestamp=tx.get('received') or datetime.now().isoformat()
+        )
 
     def check_all_wallets(self):
         """Check all monitored wallets for new transactions."""
         print(f"\n=== Starting wallet check at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n")
 
         start_time = time.time()
-        total_new_txs = 0
+        cycle_txs = []
 
-        for coin_type, wallets in self.wallets.items():
-            print(f"Checking {len(wallets)} {coin_type} wallets...")
+        # One CoinGecko request warms all three prices for the cycle;
+        # every wallet group shares them instead of re-asking per call
+        prices = self.api_client.get_prices(list(self.wallets))
 
-            for wallet in wallets:
-                new_txs = self.check_wallet(wallet, coin_type)
-                total_new_txs += len(new_txs)
+        for coin_type, wallets in self.wallets.items():
+            # Gate the scan on the chain tip: no new block since last
+            # cycle means no new confirmed transactions for these wallets
+            height = self.api_client.get_chain_height(coin_type)
+            if height is not None and height == self._chain_heights.get(coin_type):
+                print(f"No new {coin_type} block (height {height}), skipping scan")
+                continue
+            if height is not None:
+                self._chain_heights[coin_type] = height
 
-                if new_txs:
-                    for tx in new_txs:
-                        direction = "sent" if tx['is_outgoing'] else "received"
-                        exchange_info = f" ({tx['exchange_name']})" if tx['is_exchange_related'] else ""
-                        usd_value = f"${tx['amount_usd']:,.0f}" if tx['amount_usd'] else "?"
+            print(f"Checking {len(wallets)} {coin_type} wallets...")
 
-                        print(f"  [NEW] Whale #{tx['wallet_rank']} {direction} "
-                              f"{tx['amount_native']:.2f} {coin_type} ({usd_value}){exchange_info}")
+            # Wallet checks are network-bound, so overlap the batched
+            # groups on the pool; the API client's rate limiter keeps the
+            # request budget global. Results are gathered first and
+            # printed sequentially below, so worker interleaving never
+            # scrambles the log.
+            groups = [wallets[i:i + 25] for i in range(0, len(wallets), 25)]
+            coin_price = prices.get(coin_type)
+            # Snapshot every tracked height for the coin in one query and
+            # share it across the groups, instead of one SELECT per group
+            last_blocks = self.database.get_last_blocks(coin_type)
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                results = list(executor.map(
+                    lambda group: self.check_wallet_group(group, coin_type,
+                                                          coin_price, last_blocks),
+                    groups
+                ))
+
+            # Buffer the per-transaction lines and emit them in one
+            # write: a burst of new transactions costs one stdout
+            # lock/flush instead of one per line
+            lines = []
+            for new_txs in results:
+                cycle_txs.extend(new_txs)
+
+                for tx in new_txs:
+                    direction = "sent" if tx.is_outgoing else "received"
+                    exchange_info = f" ({tx.exchange_name})" if tx.is_exchange_related else ""
+                    usd_value = f"${tx.amount_usd:,.0f}" if tx.amount_usd else "?"
+
+                    lines.append(f"  [NEW] Whale #{tx.wallet_rank} {direction} "
+                                 f"{tx.amount_native:.2f} {coin_type} ({usd_value}){exchange_info}")
+
+            if lines:
+                sys.stdout.write("\n".join(lines) + "\n")
+
+        # One bulk commit for everything the cycle detected: inserts and
+        # tracking upserts share a single transaction/fsync
+        inserted = self.database.record_transactions(cycle_txs)
+        self.stats['new_transactions'] += inserted
 
         elapsed = time.time() - start_time
         self.stats['total_checks'] += 1
         self.stats['last_check_time'] = datetime.now()
 
         print(f"\nCheck completed in {elapsed:.1f}s")
-        print(f"New transactions found: {total_new_txs}")
+        print(f"New transactions found: {len(cycle_txs)}")
         print(f"Total checks: {self.stats['total_checks']}")
         print(f"Total new transactions: {self.stats['new_transactions']}")
 
-        return total_new_txs
+        return len(cycle_txs)
 
     def run_continuous(self, interval_minutes: int = 10):
         """
@@ -2,10 +2,30 @@
 Discord notification formatter and sender.
 Creates formatted whale activity digests and sends to Discord.
 """
+import time
 from typing import List, Dict, Optional
 from datetime import datetime
 from discord_webhook import DiscordWebhook, DiscordEmbed
 
+# Discord accepts up to 10 embeds per webhook execution
+_EMBEDS_PER_WEBHOOK = 10
+
+# Embed color by significance score (index 0-10, green -> red), built
+# once instead of a fresh 10-entry dict per alert
+_SCORE_COLORS = (
+    '808080',  # 0 - gray (unscored)
+    '006600',
+    '009900',
+    '00cc00',
+    '00ff00',  # 4 - green
+    'ffff00',
+    'ffcc00',  # 6 - orange/yellow
+    'ff9900',
+    'ff6600',
+    'ff3300',
+    'ff0000',  # 10 - red, highest
+)
+
 
 class DiscordNotifier:
     """Handle Discord webhook notifications."""
@@ -20,6 +40,9 @@ class DiscordNotifier:
             'LTC': ':white_circle:'         # ⚪
         }
 
+        # Alert embeds waiting for the next flush() (see enqueue_alert)
+        self._pending = []
+
     def _format_amount(self, amount: float, decimals: int = 2) -> str:
         """Format large numbers with commas."""
         return f"{amount:,.{decimals}f}"
@@ -48,28 +71,29 @@ class DiscordNotifier:
 
         # Main title
         title = f"🐋 DAILY WHALE DIGEST - {date}"
-        description = "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+
+        # Build the description as a list of parts joined once at the
+        # end: appends stay O(1) instead of str += re-copying the whole
+        # description as per-wallet data grows
+        parts = ["━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"]
 
         # Add summary for each coin
         for coin_type in ['BTC', 'DOGE', 'LTC']:
-            if coin_type not in summaries:
-                continue
-
-            stats = summaries[coin_type]
-            if stats['transaction_count'] == 0:
+            stats = summaries.get(coin_type)
+            if not stats or stats.get('transaction_count', 0) == 0:
                 continue
 
             emoji = self.coin_emoji.get(coin_type, '')
-            description += f"{emoji} **{coin_type} Whales**\n"
-            description += "━━━━━━━━━━━━━━━━━━━━\n"
+            parts.append(f"{emoji} **{coin_type} Whales**\n")
+            parts.append("━━━━━━━━━━━━━━━━━━━━\n")
 
             # Significant moves
             sig_count = stats.get('significant_count', 0)
             total_volume_usd = stats.get('total_volume_usd', 0)
 
             if sig_count > 0:
-                description += f"🚨 **{sig_count} significant moves** | "
-                description += f"**{self._format_usd(total_volume_usd)} total volume**\n\n"
+                parts.append(f"🚨 **{sig_count} significant moves** | ")
+                parts.append(f"**{self._format_usd(total_volume_usd)} total volume**\n\n")
 
             # Exchange flow
             exchange_inflow = stats.get('exchange_inflow', 0)
@@ -78,7 +102,7 @@ class DiscordNotifier:
 
             if exchange_inflow > 0 or exchange_outflow > 0:
                 flow_direction = "net inflow" if net_flow > 0 else "net outflow"
-                description += f"📊 **Exchange flow:** {self._format_amount(abs(net_flow))} {coin_type} {flow_direction}\n"
+                parts.append(f"📊 **Exchange flow:** {self._format_amount(abs(net_flow))} {coin_type} {flow_direction}\n")
 
             # Most active wallets
             most_active = stats.get('most_active', [])
@@ -86,13 +110,15 @@ class DiscordNotifier:
                 top_whale = most_active[0]
                 rank = top_whale.get('wallet_rank', '?')
                 tx_count = top_whale.get('tx_count', 0)
-                description += f"⚡ **Most active:** Whale #{rank} ({tx_count} transactions)\n"
+                parts.append(f"⚡ **Most active:** Whale #{rank} ({tx_count} transactions)\n")
 
-            description += "\n"
+            parts.append("\n")
 
         # Add footer
-        description += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-        description += "_Generated with Claude Code_"
+        parts.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
+        parts.append("_Generated with Claude Code_")
+
+        description = "".join(parts)
 
         # Create embed
         embed = DiscordEmbed(
@@ -117,16 +143,8 @@ class DiscordNotifier:
             print(f"[ERROR] Failed to send Discord notification: {e}")
             return False
 
-    def send_significant_transaction_alert(self, tx: Dict, analysis: Dict) -> bool:
-        """
-        Send alert for a significant transaction.
-
-        Args:
-            tx: Transaction dict
-            analysis: Analysis result from SignificanceAnalyzer
-        """
-        webhook = DiscordWebhook(url=self.webhook_url)
-
+    def _render_alert_embed(self, tx: Dict, analysis: Dict) -> DiscordEmbed:
+        """Build the embed for a significant-transaction alert."""
         coin_type = tx['coin_type']
         emoji = self.coin_emoji.get(coin_type, '')
 
@@ -163,21 +181,8 @@ class DiscordNotifier:
         description += f"\n**TX:** `{tx_hash[:16]}...`"
 
         # Create embed
-        color_map = {
-            10: 'ff0000',  # Red - highest
-            9: 'ff3300',
-            8: 'ff6600',
-            7: 'ff9900',
-            6: 'ffcc00',  # Orange/Yellow
-            5: 'ffff00',
-            4: '00ff00',  # Green
-            3: '00cc00',
-            2: '009900',
-            1: '006600'
-        }
-
         score = analysis.get('significance_score', 0)
-        color = color_map.get(score, '808080')  # Gray default
+        color = _SCORE_COLORS[score] if 0 <= score <= 10 else '808080'
 
         embed = DiscordEmbed(
             title=title,
@@ -188,7 +193,18 @@ class DiscordNotifier:
         embed.set_footer(text=f"Significance: {score}/10")
         embed.set_timestamp()
 
-        webhook.add_embed(embed)
+        return embed
+
+    def send_significant_transaction_alert(self, tx: Dict, analysis: Dict) -> bool:
+        """
+        Send alert for a significant transaction.
+
+        Args:
+            tx: Transaction dict
+            analysis: Analysis result from SignificanceAnalyzer
+        """
+        webhook = DiscordWebhook(url=self.webhook_url)
+        webhook.add_embed(self._render_alert_embed(tx, analysis))
 
         try:
             response = webhook.execute()
@@ -197,6 +213,48 @@ class DiscordNotifier:
             print(f"[ERROR] Failed to send transaction alert: {e}")
             return False
 
+    def enqueue_alert(self, tx: Dict, analysis: Dict):
+        """Queue a significant-transaction alert for the next flush().
+
+        Rendering happens now; the HTTP round trip is deferred so a busy
+        cycle's alerts ride out in batches of 10 embeds per webhook call
+        instead of one call each.
+        """
+        self._pending.append(self._render_alert_embed(tx, analysis))
+
+    def flush(self) -> int:
+        """Send all queued alerts, batching 10 embeds per webhook call.
+
+        Returns the number of alerts successfully sent. Batches are
+        spaced 0.5s apart to stay under Discord's webhook rate limit;
+        a failed batch is dropped (not requeued) so a dead webhook can't
+        grow the queue without bound.
+        """
+        sent = 0
+        first = True
+        while self._pending:
+            batch = self._pending[:_EMBEDS_PER_WEBHOOK]
+            del self._pending[:_EMBEDS_PER_WEBHOOK]
+
+            if not first:
+                time.sleep(0.5)
+            first = False
+
+            webhook = DiscordWebhook(url=self.webhook_url)
+            for embed in batch:
+                webhook.add_embed(embed)
+
+            try:
+                response = webhook.execute()
+                if response.status_code == 200:
+                    sent += len(batch)
+                else:
+                    print(f"[ERROR] Discord alert batch failed: {response.status_code}")
+            except Exception as e:
+                print(f"[ERROR] Failed to send alert batch: {e}")
+
+        return sent
+
     def send_test_message(self) -> bool:
         """Send a test message to verify webhook is working."""
         webhook = DiscordWebhook(